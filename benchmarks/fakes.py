@@ -0,0 +1,240 @@
+import hashlib
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import discord
+
+from utils.audio import FRAME_SIZE
+
+FRAME_DELAY = 0.02  # Seconds of audio in one frame
+
+
+class FakeYoutubeDL:
+    """Stands in for yt_dlp.YoutubeDL and returns canned ``extract_info`` payloads.
+
+    Class attributes configure every instance: ``latency`` is the mean time
+    one extraction blocks its worker thread, ``stream`` the URL handed to
+    FFmpeg (a local file or an ``anullsrc`` filter) and ``duration`` the
+    length of every track.
+    """
+
+    latency = 0.3
+    jitter = 0.5  # Latency varies by up to this share either way
+    stream = 'anullsrc=r=48000:cl=stereo'
+    codec = 'none'  # Not Opus, so every track is decoded to PCM
+    duration = 30
+    playlist_size = 200
+    calls = 0
+    _lock = threading.Lock()
+
+    def __init__(self, params=None):
+        self.params = dict(params or {})
+
+    @classmethod
+    def video_id(cls, query):
+        return hashlib.md5(query.encode()).hexdigest()[:11]
+
+    def _info(self, video_id, title):
+        return {
+            'id': video_id,
+            'title': title,
+            'url': self.stream,
+            'webpage_url': f'https://www.youtube.com/watch?v={video_id}',
+            'duration': self.duration,
+            'uploader': f'Channel {video_id[:2]}',
+            'thumbnail': None,
+            'acodec': self.codec,
+        }
+
+    def _flat(self, video_id, title):
+        return {
+            'id': video_id,
+            'title': title,
+            'url': f'https://www.youtube.com/watch?v={video_id}',
+            'duration': self.duration,
+            'uploader': f'Channel {video_id[:2]}',
+        }
+
+    def extract_info(self, query, download=False):
+        with FakeYoutubeDL._lock:
+            FakeYoutubeDL.calls += 1
+        time.sleep(self.latency * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+        parsed = urlparse(query)
+        params = parse_qs(parsed.query)
+        if 'list' in params:
+            first, last = 1, self.playlist_size
+            if 'playlist_items' in self.params:
+                first, last = map(int, self.params['playlist_items'].split('-'))
+            last = min(last, self.playlist_size)
+            playlist = params['list'][0]
+            entries = []
+            for index in range(first, last + 1):
+                video_id = self.video_id(f'{playlist}:{index}')
+                make = self._flat if self.params.get('extract_flat') else self._info
+                entries.append(make(video_id, f'{playlist} track {index}'))
+            return {'id': playlist, 'title': playlist, 'entries': entries}
+        if 'v' in params:
+            return self._info(params['v'][0], f'Video {params["v"][0]}')
+        # Plain text goes through default_search
+        return {'entries': [self._info(self.video_id(query), query.title())]}
+
+
+class SilentSource(discord.AudioSource):
+    """In-process replacement for FFmpeg that yields silent PCM frames"""
+
+    _frame = b'\0' * FRAME_SIZE
+
+    def __init__(self, location, *, before_options=None, options=None, codec=None, **kwargs):
+        self.frames = int(FakeYoutubeDL.duration / FRAME_DELAY)
+        if before_options and '-ss' in before_options:
+            start = float(before_options.split('-ss')[1].split()[0])
+            self.frames = max(self.frames - int(start / FRAME_DELAY), 0)
+
+    def read(self):
+        if self.frames <= 0:
+            return b''
+        self.frames -= 1
+        return self._frame
+
+    def cleanup(self):
+        self.frames = 0
+
+
+class FakeVoiceClient:
+    """Plays a source on its own thread at real-time pace, like discord.py's AudioPlayer"""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.source = None
+        self.frames_played = 0
+        self._thread = None
+        self._stopped = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._connected = True
+        self.encoder = object()  # Set up front so the cog never builds a real Opus encoder
+
+    def is_connected(self):
+        return self._connected
+
+    def is_playing(self):
+        return self._thread is not None and self._thread.is_alive() and self._resumed.is_set()
+
+    def is_paused(self):
+        return self._thread is not None and self._thread.is_alive() and not self._resumed.is_set()
+
+    def play(self, source, *, after=None):
+        if not self._connected:
+            raise discord.ClientException('Not connected to voice.')
+        if self._thread is not None and self._thread.is_alive():
+            raise discord.ClientException('Already playing audio.')
+        self.source = source
+        self._stopped = stopped = threading.Event()
+        self._resumed.set()
+        self._thread = threading.Thread(target=self._run, args=(source, after, stopped), daemon=True)
+        self._thread.start()
+
+    def _run(self, source, after, stopped):
+        next_frame = time.perf_counter()
+        error = None
+        try:
+            while not stopped.is_set():
+                if not self._resumed.is_set():
+                    self._resumed.wait(0.1)
+                    next_frame = time.perf_counter()
+                    continue
+                if not source.read():
+                    break
+                self.frames_played += 1
+                next_frame += FRAME_DELAY
+                time.sleep(max(0.0, next_frame - time.perf_counter()))
+        except Exception as e:
+            error = e
+        finally:
+            source.cleanup()
+            if self._thread is threading.current_thread():
+                self._thread = None  # Like discord.py, no longer playing once ``after`` runs
+            if after is not None:
+                after(error)
+
+    def pause(self):
+        self._resumed.clear()
+
+    def resume(self):
+        self._resumed.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._resumed.set()
+        self._thread = None  # Like discord.py, free to play again straight away
+
+    async def disconnect(self, *, force=False):
+        self._connected = False
+        self.stop()
+
+
+class FakeMessage:
+    def __init__(self, embed):
+        self.embed = embed
+
+    async def edit(self, *, embed=None, **kwargs):
+        self.embed = embed
+
+
+class FakeChannel:
+    def __init__(self, channel_id, guild):
+        self.id = channel_id
+        self.guild = guild
+        self.members = []
+
+    async def connect(self, **kwargs):
+        return FakeVoiceClient(self)
+
+
+class FakeVoiceState:
+    def __init__(self, channel):
+        self.channel = channel
+
+
+class FakeMember:
+    def __init__(self, member_id, channel):
+        self.id = member_id
+        self.bot = False
+        self.voice = FakeVoiceState(channel)
+
+
+class FakeGuild:
+    def __init__(self, guild_id):
+        self.id = guild_id
+        self.voice_channel = FakeChannel(guild_id * 10, self)
+
+
+class FakeContext:
+    """Just enough of commands.Context for the music commands"""
+
+    def __init__(self, guild):
+        self.guild = guild
+        self.prefix = '!'
+        self.author = FakeMember(guild.id * 10 + 1, guild.voice_channel)
+        guild.voice_channel.members.append(self.author)
+        self.sent = []
+
+    async def send(self, content=None, *, embed=None, **kwargs):
+        message = FakeMessage(embed)
+        self.sent.append(message)
+        return message
+
+
+class FakeBot:
+    def __init__(self):
+        self.guilds = {}
+
+    def get_guild(self, guild_id):
+        return self.guilds.get(guild_id)
+
+    def get_channel(self, channel_id):
+        guild = self.guilds.get(channel_id // 10)
+        return guild.voice_channel if guild else None
@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import discord
+import yt_dlp
+
+from benchmarks.fakes import FakeBot, FakeContext, FakeGuild, FakeYoutubeDL, SilentSource
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# Result key -> True when a higher value is better
+DIRECTIONS = {
+    'throughput': True,
+    'play_p50_ms': False,
+    'play_p99_ms': False,
+    'queue_p50_ms': False,
+    'queue_p99_ms': False,
+    'skip_p50_ms': False,
+    'skip_p99_ms': False,
+    'first_audio_p50_ms': False,
+    'first_audio_p99_ms': False,
+    'memory_per_guild_kb': False,
+    'cpu_per_stream_pct': False,
+}
+
+# Latency changes smaller than this never count as a regression
+MIN_MS_CHANGE = 1.0
+
+logger = logging.getLogger('benchmark')
+
+
+def rss_bytes():
+    """Resident memory of this process"""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def children_cpu():
+    """CPU seconds used so far by running child processes (the FFmpeg decoders)"""
+    ticks = 0
+    parent = os.getpid()
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                # Fields after the parenthesised command name
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent:
+            ticks += int(fields[11]) + int(fields[12])
+    return ticks / os.sysconf('SC_CLK_TCK')
+
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method='inclusive')[q - 1]
+
+
+def configure_source(args):
+    """Point stream URLs at a local file, an anullsrc filter or the in-process stand-in"""
+    FakeYoutubeDL.latency = args.latency
+    FakeYoutubeDL.duration = args.track_seconds
+    FakeYoutubeDL.playlist_size = args.playlist_size
+    if args.source == 'silent':
+        discord.FFmpegPCMAudio = SilentSource
+        discord.FFmpegOpusAudio = SilentSource
+        return None
+    if not shutil.which('ffmpeg'):
+        sys.exit("ffmpeg is not installed - use --source silent")
+    if args.source == 'anullsrc':
+        FakeYoutubeDL.stream = f'anullsrc=r=48000:cl=stereo:d={args.track_seconds}'
+        return '-f lavfi'
+    FakeYoutubeDL.stream = os.path.abspath(args.source)
+    return ''
+
+
+def make_query(args, rng):
+    if rng.random() < args.playlists:
+        return f'https://www.youtube.com/playlist?list=PL{rng.randrange(10)}'
+    return f'song number {rng.randrange(args.distinct)}'
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='echox-bench-')
+    os.environ.update({
+        'CACHE_PATH': os.path.join(workdir, 'cache.db'),
+        'SNAPSHOT_PATH': os.path.join(workdir, 'snapshot.db'),
+        'SEARCH_INDEX_PATH': os.path.join(workdir, 'search.db'),
+        'AUDIO_CACHE_DIR': '',
+        'METRICS_PORT': '0',
+        'EXTRACTOR_WORKERS': str(args.workers),
+    })
+    yt_dlp.YoutubeDL = FakeYoutubeDL
+    before_options = configure_source(args)
+
+    from cogs.music import Music
+
+    bot = FakeBot()
+    cog = Music(bot)
+    if before_options is not None:
+        cog.ffmpeg_options['before_options'] = before_options
+    await cog.cog_load()
+    command = {c.name: c for c in cog.get_commands()}
+
+    guilds = [FakeGuild(guild_id) for guild_id in range(1, args.guilds + 1)]
+    bot.guilds = {guild.id: guild for guild in guilds}
+    contexts = [FakeContext(guild) for guild in guilds]
+
+    latencies = {'play': [], 'queue': [], 'skip': []}
+    limit = asyncio.Semaphore(args.concurrency)
+
+    # Abusive guilds paste several big playlists at once; their commands aren't measured
+    abusers = [FakeContext(FakeGuild(guild_id)) for guild_id in range(args.guilds + 1, args.guilds + args.abusers + 1)]
+    bot.guilds.update({ctx.guild.id: ctx.guild for ctx in abusers})
+    abuse = [
+        asyncio.create_task(command['play'].callback(
+            cog, ctx, query=f'https://www.youtube.com/playlist?list=PLabuse{ctx.guild.id}x{number}'
+        ))
+        for ctx in abusers for number in range(5)
+    ]
+
+    async def timed(name, cmd, ctx, **kwargs):
+        async with limit:
+            started = time.perf_counter()
+            await cmd.callback(cog, ctx, **kwargs)
+            latencies[name].append(time.perf_counter() - started)
+
+    rss_before = rss_bytes()
+    command_time = 0.0
+
+    # Every guild joins and starts playing, then queues more songs
+    for round_number in range(args.songs):
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            timed('play', command['play'], ctx, query=make_query(args, rng)) for ctx in contexts
+        ))
+        command_time += time.perf_counter() - started
+        logger.info(f"play round {round_number + 1}/{args.songs} done")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed('queue', command['queue'], ctx) for ctx in contexts))
+    command_time += time.perf_counter() - started
+
+    # Wait for every guild with songs to be playing before measuring the steady state
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        waiting = [
+            guild_id for guild_id, vc in cog.voice_clients.items()
+            if not vc.is_playing() and (cog.queues[guild_id].current or len(cog.queues[guild_id]))
+        ]
+        if not waiting:
+            break
+        await asyncio.sleep(0.1)
+    rss_after = rss_bytes()
+
+    cpu_before = time.process_time() + children_cpu()
+    wall_before = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    cpu_used = time.process_time() + children_cpu() - cpu_before
+    wall = time.perf_counter() - wall_before
+    streams = sum(1 for vc in cog.voice_clients.values() if vc.is_playing())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed('skip', command['skip'], ctx) for ctx in contexts))
+    command_time += time.perf_counter() - started
+    await asyncio.sleep(1)
+
+    failed = sum(
+        1 for ctx in contexts for message in ctx.sent
+        if message.embed is not None and message.embed.title.startswith(('❌', '⏳', '🚦'))
+    )
+    commands = sum(len(samples) for samples in latencies.values())
+    results = {
+        'throughput': commands / command_time,
+        'failed_commands': failed,
+        'streams': streams,
+        'extractions': FakeYoutubeDL.calls,
+        'memory_per_guild_kb': (rss_after - rss_before) / len(contexts) / 1024,
+        'cpu_per_stream_pct': cpu_used / wall / max(streams, 1) * 100,
+        'first_audio_p50_ms': cog.first_audio_latency.quantile(0.5) * 1000,
+        'first_audio_p99_ms': cog.first_audio_latency.quantile(0.99) * 1000,
+    }
+    for name, samples in latencies.items():
+        results[f'{name}_p50_ms'] = percentile(samples, 50) * 1000
+        results[f'{name}_p99_ms'] = percentile(samples, 99) * 1000
+
+    for task in abuse:
+        task.cancel()
+    for ctx in abusers:
+        cog.cancel_expansions(ctx.guild.id)
+    for vc in cog.voice_clients.values():
+        vc.stop()
+    await cog.cog_unload()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, tolerance, directions=DIRECTIONS):
+    """Return the result keys that got worse than the baseline by more than ``tolerance``"""
+    regressions = []
+    for key, higher_is_better in directions.items():
+        old, new = baseline.get(key), results.get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        worse = change < -tolerance if higher_is_better else change > tolerance
+        if key.endswith('_ms') and abs(new - old) < MIN_MS_CHANGE:
+            worse = False  # Sub-millisecond timings are mostly noise
+        marker = '  REGRESSION' if worse else ''
+        print(f"  {key:<22} {old:>10.2f} -> {new:>10.2f} ({change:+.0%}){marker}")
+        if worse:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the music cog")
+    parser.add_argument('--guilds', type=int, default=200)
+    parser.add_argument('--songs', type=int, default=3, help="play commands per guild")
+    parser.add_argument('--distinct', type=int, default=100, help="distinct search queries")
+    parser.add_argument('--playlists', type=float, default=0.05, help="share of plays that are playlists")
+    parser.add_argument('--playlist-size', type=int, default=200)
+    parser.add_argument('--abusers', type=int, default=0,
+                        help="extra guilds that each queue five playlists at the start, unmeasured")
+    parser.add_argument('--latency', type=float, default=0.3, help="mean extraction time in seconds")
+    parser.add_argument('--workers', type=int, default=4, help="extractor threads")
+    parser.add_argument('--concurrency', type=int, default=50, help="commands in flight at once")
+    parser.add_argument('--track-seconds', type=int, default=30)
+    parser.add_argument('--duration', type=float, default=10, help="steady-state window in seconds")
+    parser.add_argument('--source', default='silent',
+                        help="'silent' (no FFmpeg), 'anullsrc' or the path of a local audio file")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save', metavar='NAME', help="save the results as a baseline")
+    parser.add_argument('--compare', metavar='NAME', help="compare against a saved baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    logger.setLevel(logging.INFO)
+
+    results = asyncio.run(run(args))
+    print(f"\n{args.guilds} guilds, {args.songs} songs each, source={args.source}")
+    for key, value in results.items():
+        print(f"  {key:<22} {value:>10.2f}")
+
+    params = {k: v for k, v in vars(args).items() if k not in ('save', 'compare', 'tolerance')}
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(os.path.join(BASELINE_DIR, f'{args.save}.json'), 'w') as f:
+            json.dump({'params': params, 'results': results}, f, indent=2)
+        print(f"\nSaved baseline '{args.save}'")
+
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f'{args.compare}.json')) as f:
+            baseline = json.load(f)
+        if baseline['params'] != params:
+            print("\nWarning: baseline was recorded with different parameters")
+        print(f"\nCompared with '{args.compare}':")
+        if compare(results, baseline['results'], args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
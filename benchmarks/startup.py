@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Result key -> True when a higher value is better
+DIRECTIONS = {
+    'import_discord_ms': False,
+    'import_cog_ms': False,
+    'cog_init_ms': False,
+    'cog_load_ms': False,
+    'first_command_ms': False,
+    'ready_ms': False,
+    'extractor_warmup_ms': False,
+}
+
+
+def measure():
+    """Time one cold start of the music cog; runs in a fresh interpreter"""
+    results = {}
+    started = last = time.perf_counter()
+
+    def mark(key):
+        nonlocal last
+        now = time.perf_counter()
+        results[key] = (now - last) * 1000
+        last = now
+
+    import discord  # noqa: F401
+    mark('import_discord_ms')
+    from cogs.music import Music
+    mark('import_cog_ms')
+    # Loaded only if the cog didn't already need it
+    results['yt_dlp_imported'] = float('yt_dlp' in sys.modules)
+
+    from benchmarks.fakes import FakeBot, FakeContext, FakeGuild
+
+    async def run():
+        bot = FakeBot()
+        guild = FakeGuild(1)
+        bot.guilds = {guild.id: guild}
+        mark('fakes_ms')
+        cog = Music(bot)
+        mark('cog_init_ms')
+        await cog.cog_load()
+        mark('cog_load_ms')
+        # What a user sees first: a command that needs no extraction
+        command = {c.name: c for c in cog.get_commands()}
+        await command['queue'].callback(cog, FakeContext(guild))
+        mark('first_command_ms')
+        results['ready_ms'] = (last - started) * 1000 - results.pop('fakes_ms')
+        await cog.extractor.warm()
+        mark('extractor_warmup_ms')
+        await cog.cog_unload()
+
+    asyncio.run(run())
+    return results
+
+
+def cold_start(env):
+    """Run ``measure`` in a new process, so nothing is imported yet"""
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup', '--child'],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start timings of the music cog")
+    parser.add_argument('--runs', type=int, default=5, help="cold starts; the median is reported")
+    parser.add_argument('--warmup', default='lazy', help="EXTRACTOR_WARMUP mode to start with")
+    parser.add_argument('--save', metavar='NAME', help="save the results as a baseline")
+    parser.add_argument('--compare', metavar='NAME', help="compare against a saved baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure()))
+        return
+    # Only here - it imports discord and yt-dlp, which a child must time itself
+    from benchmarks.load import BASELINE_DIR, compare
+
+    workdir = tempfile.mkdtemp(prefix='echox-startup-')
+    env = {
+        **os.environ,
+        'CACHE_PATH': os.path.join(workdir, 'cache.db'),
+        'SNAPSHOT_PATH': os.path.join(workdir, 'snapshot.db'),
+        'SEARCH_INDEX_PATH': os.path.join(workdir, 'search.db'),
+        'AUDIO_CACHE_DIR': '',
+        'METRICS_PORT': '0',
+        'EXTRACTOR_WARMUP': args.warmup,
+    }
+    cold_start(env)  # The first run also compiles bytecode; don't count it
+    runs = [cold_start(env) for _ in range(args.runs)]
+    results = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+    print(f"\nCold start, median of {args.runs} runs, EXTRACTOR_WARMUP={args.warmup}")
+    for key, value in results.items():
+        print(f"  {key:<22} {value:>10.2f}")
+
+    name = f"startup-{args.save or args.compare}"
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(os.path.join(BASELINE_DIR, f'{name}.json'), 'w') as f:
+            json.dump({'params': {'warmup': args.warmup}, 'results': results}, f, indent=2)
+        print(f"\nSaved baseline '{args.save}'")
+
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f'{name}.json')) as f:
+            baseline = json.load(f)
+        if baseline['params'] != {'warmup': args.warmup}:
+            print("\nWarning: baseline was recorded with different parameters")
+        print(f"\nCompared with '{args.compare}':")
+        if compare(results, baseline['results'], args.tolerance, DIRECTIONS):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,44 @@
+from utils.startup import timer as startup  # First, so the imports below are timed too
 import discord
 from discord.ext import commands
 import os
 import logging
 from dotenv import load_dotenv
 import asyncio
+import time
+
+from utils.logs import setup_logging
+
+startup.mark('imports')
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler()
-    ]
+# Configure logging - records are written by a background thread
+LOG_PATH = os.getenv('LOG_PATH', 'bot.log')
+if os.getenv('SHARD_IDS') is not None:
+    # One file per cluster process, so processes never rotate each other's files
+    root, ext = os.path.splitext(LOG_PATH)
+    LOG_PATH = f"{root}-{os.getenv('CLUSTER_ID', '0')}{ext}"
+setup_logging(
+    path=LOG_PATH,
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    json_format=os.getenv('LOG_FORMAT', 'text') == 'json',
+    max_bytes=int(os.getenv('LOG_MAX_MB', '10')) * 1024 * 1024,
+    backups=int(os.getenv('LOG_BACKUPS', '5')),
+    rotate_when=os.getenv('LOG_ROTATE_WHEN') or None,
+    rate_limit=int(os.getenv('LOG_RATE_LIMIT', '5'))
 )
 logger = logging.getLogger(__name__)
+startup.mark('logging')
 
 # Bot configuration
 TOKEN = os.getenv('TOKEN')
 PREFIX = os.getenv('PREFIX', '!')
+SHARD_COUNT = os.getenv('SHARD_COUNT')
+SHARD_IDS = os.getenv('SHARD_IDS')  # Set by cluster.py for each worker process
+CLUSTER_ID = int(os.getenv('CLUSTER_ID', '0'))
+HEALTH_INTERVAL = int(os.getenv('HEALTH_INTERVAL', '15'))
 
 if not TOKEN:
     logger.error("❌ No TOKEN found in environment variables!")
@@ -32,10 +49,23 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.voice_states = True
 
-bot = commands.Bot(command_prefix=PREFIX, intents=intents, help_command=None)
+if SHARD_COUNT:
+    # Sharded, either on its own or as one process of a cluster
+    bot = commands.AutoShardedBot(
+        command_prefix=PREFIX,
+        intents=intents,
+        help_command=None,
+        shard_count=int(SHARD_COUNT),
+        shard_ids=[int(i) for i in SHARD_IDS.split(',')] if SHARD_IDS else None
+    )
+else:
+    bot = commands.Bot(command_prefix=PREFIX, intents=intents, help_command=None)
 
 @bot.event
 async def on_ready():
+    if 'gateway' not in startup.phases:
+        startup.mark('gateway')
+        logger.info(f"⏱️ {startup.report()}")
     logger.info(f'🎵 {bot.user} is now playing music!')
     logger.info(f'🔧 Prefix: {PREFIX}')
     logger.info(f'🌐 Connected to {len(bot.guilds)} servers')
@@ -65,6 +95,13 @@ async def on_command_error(ctx, error):
             color=discord.Color.red()
         )
         await ctx.send(embed=embed)
+    elif isinstance(error, commands.MissingPermissions):
+        embed = discord.Embed(
+            title="❌ Missing Permissions",
+            description="You don't have permission to use this command.",
+            color=discord.Color.red()
+        )
+        await ctx.send(embed=embed)
     else:
         logger.error(f"Unhandled error: {error}")
         embed = discord.Embed(
@@ -103,16 +140,25 @@ async def help_command(ctx, command_name=None):
         )
         
         music_commands = [
-            f"`{PREFIX}play <song/url>` - Play music from YouTube/Spotify/SoundCloud",
+            f"`{PREFIX}play <song/url>` - Play music from YouTube/Spotify/Deezer/SoundCloud",
+            f"`{PREFIX}search <query>` - Pick from songs played before",
             f"`{PREFIX}pause` - Pause the current song",
             f"`{PREFIX}resume` - Resume playback",
             f"`{PREFIX}skip` - Skip to the next song",
             f"`{PREFIX}stop` - Stop playback and clear queue",
-            f"`{PREFIX}queue` - Show the current queue",
+            f"`{PREFIX}queue [page]` - Show the current queue",
             f"`{PREFIX}nowplaying` - Show current song info",
+            f"`{PREFIX}seek <time>` - Jump to a time in the song (1:30, +15, -15)",
             f"`{PREFIX}volume <1-100>` - Set playback volume",
+            f"`{PREFIX}filter [name]` - Toggle an audio filter (bassboost, nightcore, ...)",
+            f"`{PREFIX}eq <bass> <mid> <treble>` - Set the equalizer in dB",
             f"`{PREFIX}shuffle` - Shuffle the queue",
-            f"`{PREFIX}disconnect` - Disconnect from voice channel"
+            f"`{PREFIX}remove <position>` - Remove a song from the queue",
+            f"`{PREFIX}move <from> <to>` - Move a song within the queue",
+            f"`{PREFIX}jump <position>` - Skip to a position in the queue",
+            f"`{PREFIX}radio [join <name>|leave]` - List, join or leave radio stations",
+            f"`{PREFIX}disconnect` - Disconnect from voice channel",
+            f"`{PREFIX}stats` - Show latency stats (admins only)"
         ]
         
         embed.add_field(
@@ -133,11 +179,32 @@ async def load_cogs():
     except Exception as e:
         logger.error(f"❌ Failed to load music cog: {e}")
 
-async def main():
+async def report_health(status_queue):
+    """Send this process's health to the cluster launcher periodically"""
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        status_queue.put_nowait({
+            'cluster': CLUSTER_ID,
+            'pid': os.getpid(),
+            'shards': sorted(bot.shards) if isinstance(bot, commands.AutoShardedBot) else [0],
+            'guilds': len(bot.guilds),
+            'voice_clients': len(bot.voice_clients),
+            'latency': bot.latency,
+            'time': time.time()
+        })
+        await asyncio.sleep(HEALTH_INTERVAL)
+
+async def main(status_queue=None):
     """Main function to run the bot"""
     async with bot:
         await load_cogs()
-        await bot.start(TOKEN)
+        startup.mark('cogs')
+        if status_queue is not None:
+            asyncio.create_task(report_health(status_queue))
+        # bot.start(), split so logging in is timed on its own
+        await bot.login(TOKEN)
+        startup.mark('login')
+        await bot.connect()
 
 if __name__ == '__main__':
     try:
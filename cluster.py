@@ -0,0 +1,151 @@
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import time
+import urllib.request
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - [launcher] %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+TOKEN = os.getenv('TOKEN')
+HEALTH_INTERVAL = int(os.getenv('HEALTH_INTERVAL', '15'))
+RESTART_DELAY = int(os.getenv('CLUSTER_RESTART_DELAY', '10'))
+
+
+def recommended_shards():
+    """Ask Discord how many shards the bot should run"""
+    request = urllib.request.Request(
+        'https://discord.com/api/v10/gateway/bot',
+        headers={'Authorization': f'Bot {TOKEN}', 'User-Agent': 'EchoX cluster launcher'}
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)['shards']
+
+
+def split_shards(shard_count, processes):
+    """Split shard IDs into contiguous, evenly sized ranges"""
+    ranges = []
+    start = 0
+    for cluster in range(processes):
+        size = shard_count // processes + (1 if cluster < shard_count % processes else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def run_worker(cluster_id, shard_ids, shard_count, status_queue):
+    """Entry point of a worker process - runs the bot for a range of shards"""
+    os.environ['CLUSTER_ID'] = str(cluster_id)
+    os.environ['SHARD_IDS'] = ','.join(map(str, shard_ids))
+    os.environ['SHARD_COUNT'] = str(shard_count)
+
+    import asyncio
+    import bot
+
+    try:
+        asyncio.run(bot.main(status_queue))
+    except KeyboardInterrupt:
+        pass
+
+
+class Cluster:
+    """One worker process and the last health report it sent"""
+
+    def __init__(self, cluster_id, shard_ids):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.process = None
+        self.health = None
+        self.started = 0.0
+        self.restarts = 0
+
+    def start(self, context, shard_count, status_queue):
+        self.process = context.Process(
+            target=run_worker,
+            args=(self.cluster_id, self.shard_ids, shard_count, status_queue),
+            name=f'cluster-{self.cluster_id}'
+        )
+        self.process.start()
+        self.started = time.time()
+        logger.info(f"🚀 Cluster {self.cluster_id} started (pid {self.process.pid}, "
+                    f"shards {self.shard_ids[0]}-{self.shard_ids[-1]})")
+
+
+def log_health(clusters):
+    """Log a one-line summary of the whole cluster"""
+    guilds = sum(c.health['guilds'] for c in clusters if c.health)
+    voice = sum(c.health['voice_clients'] for c in clusters if c.health)
+    parts = []
+    for c in clusters:
+        if c.health:
+            parts.append(f"#{c.cluster_id}: {c.health['guilds']} guilds, "
+                         f"{c.health['voice_clients']} voice, {c.health['latency'] * 1000:.0f}ms")
+        else:
+            parts.append(f"#{c.cluster_id}: starting")
+    logger.info(f"🌐 {guilds} guilds, {voice} voice clients | " + " | ".join(parts))
+
+
+def main():
+    """Start the worker processes and supervise them"""
+    if not TOKEN:
+        logger.error("❌ No TOKEN found in environment variables!")
+        exit(1)
+
+    shard_count = int(os.getenv('SHARD_COUNT') or recommended_shards())
+    processes = int(os.getenv('CLUSTER_PROCESSES') or os.cpu_count() or 1)
+    processes = max(1, min(processes, shard_count))
+    logger.info(f"🔧 Running {shard_count} shards across {processes} processes")
+
+    context = multiprocessing.get_context('spawn')
+    status_queue = context.Queue()
+    clusters = [Cluster(i, shard_ids) for i, shard_ids in enumerate(split_shards(shard_count, processes))]
+    for cluster in clusters:
+        cluster.start(context, shard_count, status_queue)
+
+    last_summary = time.time()
+    try:
+        while True:
+            try:
+                report = status_queue.get(timeout=HEALTH_INTERVAL)
+                clusters[report['cluster']].health = report
+            except queue.Empty:
+                pass
+
+            now = time.time()
+            for cluster in clusters:
+                if not cluster.process.is_alive():
+                    if now - cluster.started < RESTART_DELAY:
+                        continue  # Crashed right after starting - back off before retrying
+                    logger.warning(f"⚠️ Cluster {cluster.cluster_id} exited "
+                                   f"(code {cluster.process.exitcode}), restarting")
+                    cluster.health = None
+                    cluster.restarts += 1
+                    cluster.start(context, shard_count, status_queue)
+                elif cluster.health and now - cluster.health['time'] > 3 * HEALTH_INTERVAL:
+                    logger.warning(f"⚠️ Cluster {cluster.cluster_id} has not reported for "
+                                   f"{now - cluster.health['time']:.0f}s")
+
+            if now - last_summary >= HEALTH_INTERVAL:
+                log_health(clusters)
+                last_summary = now
+    except KeyboardInterrupt:
+        logger.info("🛑 Stopping clusters")
+    finally:
+        for cluster in clusters:
+            if cluster.process.is_alive():
+                cluster.process.terminate()
+        for cluster in clusters:
+            cluster.process.join(timeout=10)
+
+
+if __name__ == '__main__':
+    main()
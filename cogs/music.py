@@ -1,11 +1,29 @@
 import discord
-from discord.ext import commands
-import yt_dlp
+from discord.ext import commands, tasks
 import asyncio
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import random
 import logging
-from utils.music_utils import MusicQueue, Song
+import os
+import time
+from utils.audio import PrebufferedSource, TrackSequence
+from utils.admission import REFUSE, StreamBudget
+from utils.audio_cache import AudioCache
+from utils.cache import TrackCache, normalize_query
+from utils.dsp import PRESETS, SPEED_PRESETS, FilterChain, GainStage, LoudnessMeter, build_filters, db_to_gain
+from utils.extractor import BACKGROUND, BULK, INTERACTIVE, ExtractorBusy, ExtractorPool
+from utils.idle import IdleReaper
+from utils.metadata import MetadataClient, parse_link
+from utils import logs, metrics, startup
+from utils.music_utils import MusicQueue, Song, format_time, parse_time
+from utils.player import GuildPlayer
+from utils.prefetch import Prefetcher
+from utils.queue_view import QueuePages, QueueView
+from utils.radio import Station
+from utils.search_index import SearchIndex
+from utils.search_view import SearchPicker
+from utils.snapshot import SnapshotStore
 
 logger = logging.getLogger(__name__)
 
@@ -13,11 +31,13 @@ class Music(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.queues = {}  # Guild ID -> MusicQueue
+        self.queue_pages = {}  # Guild ID -> QueuePages, rendered queue pages
         self.voice_clients = {}  # Guild ID -> VoiceClient
         
         # YT-DLP options - Updated for better compatibility
         self.ytdl_format_options = {
-            'format': 'bestaudio/best',
+            # Prefer Opus streams so they can be passed through without re-encoding
+            'format': 'bestaudio[acodec=opus]/bestaudio/best',
             'outtmpl': '%(extractor)s-%(id)s-%(title)s.%(ext)s',
             'restrictfilenames': True,
             'noplaylist': False,
@@ -40,81 +60,1105 @@ class Music(commands.Cog):
             'options': '-vn -b:a 128k'
         }
         
-        self.ytdl = yt_dlp.YoutubeDL(self.ytdl_format_options)
+        # Optional local copies of hot tracks, played without touching the network
+        self.audio_cache = None
+        profiles = {
+            # Playlist entries are listed without resolving each video
+            'flat': {'extract_flat': 'in_playlist'}
+        }
+        audio_cache_dir = os.getenv('AUDIO_CACHE_DIR')
+        if audio_cache_dir:
+            self.audio_cache = AudioCache(
+                audio_cache_dir,
+                max_bytes=int(os.getenv('AUDIO_CACHE_MAX_MB', '2048')) * 1024 * 1024,
+                min_plays=int(os.getenv('AUDIO_CACHE_MIN_PLAYS', '2')),
+                max_tracked=int(os.getenv('AUDIO_CACHE_MAX_TRACKED', '10000')),
+                policy=os.getenv('AUDIO_CACHE_POLICY', 'lru')
+            )
+            profiles['download'] = {
+                'outtmpl': os.path.join(audio_cache_dir, '%(id)s.%(ext)s'),
+                'noplaylist': True,
+                'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'opus'}]
+            }
+
+        # Dedicated extraction workers, one YoutubeDL per worker
+        self.extractor = ExtractorPool(
+            self.ytdl_format_options,
+            workers=int(os.getenv('EXTRACTOR_WORKERS', '4')),
+            max_pending=int(os.getenv('EXTRACTOR_MAX_PENDING', '64')),
+            profiles=profiles,
+            guild_limit=int(os.getenv('EXTRACTOR_GUILD_LIMIT', '2')),
+            guild_max_pending=int(os.getenv('EXTRACTOR_GUILD_PENDING', '16')),
+            interactive_max_pending=int(os.getenv('EXTRACTOR_INTERACTIVE_PENDING', '128'))
+        )
+        # When yt-dlp is loaded: 'background' after login, 'eager' before it, 'lazy' on the first search
+        self.extractor_warmup = os.getenv('EXTRACTOR_WARMUP', 'background')
+
+        # Playlists are expanded page by page in the background
+        self.playlist_page_size = int(os.getenv('PLAYLIST_PAGE_SIZE', '50'))
+        self.playlist_max_entries = int(os.getenv('PLAYLIST_MAX_ENTRIES', '5000'))
+        self.expansions = {}  # Guild ID -> set of playlist expansion tasks
+
+        # Gapless playback - the next track's decoder starts before the current one ends
+        self.prebuffer_frames = int(float(os.getenv('PREBUFFER_SECONDS', '3')) * 50)
+        self.crossfade_frames = int(float(os.getenv('CROSSFADE_SECONDS', '0')) * 50)
+        self.ended_at = {}  # Guild ID -> monotonic time playback last stopped
+
+        # Opus streams are remuxed straight to the voice connection when possible
+        self.opus_passthrough = os.getenv('OPUS_PASSTHROUGH', '1') == '1'
+        self.source_stats = {'opus_passthrough': 0, 'pcm': 0, 'degraded': 0}
+
+        # Host-wide limit on decoders; new streams degrade, wait or are refused under load
+        self.stream_budget = StreamBudget(
+            lambda: PrebufferedSource.active,
+            max_decoders=int(os.getenv('STREAM_MAX_DECODERS', '0')),
+            max_cpu=float(os.getenv('STREAM_MAX_CPU', '0.9')),
+            degrade_cpu=float(os.getenv('STREAM_DEGRADE_CPU', '0.75')),
+            policy=os.getenv('STREAM_OVERLOAD', 'queue'),
+            queue_timeout=int(os.getenv('STREAM_QUEUE_TIMEOUT', '20'))
+        )
+        self.degraded_bitrate = int(os.getenv('STREAM_DEGRADED_BITRATE', '64'))
+        self.budget_task = None
+
+        # Volume and loudness normalization are applied to decoded PCM
+        self.volumes = {}  # Guild ID -> volume (1.0 = unchanged)
+        self.normalize = os.getenv('LOUDNESS_NORMALIZATION', '1') == '1'
+        self.loudness_target = float(os.getenv('LOUDNESS_TARGET', '-18'))
+        self.max_boost = float(os.getenv('LOUDNESS_MAX_BOOST', '6'))
+        self.filters = {}  # Guild ID -> set of active filter preset names
+        self.equalizers = {}  # Guild ID -> (bass, mid, treble) gains in dB
+        self.transition_stats = {'transitions': 0, 'gap_total': 0.0, 'gap_max': 0.0, 'gap_last': 0.0}
+
+        # Resolution cache - repeat queries skip yt-dlp entirely
+        self.cache = TrackCache(
+            path=os.getenv('CACHE_PATH', 'cache.db'),
+            max_memory=int(os.getenv('CACHE_MEMORY_ENTRIES', '2048')),
+            meta_ttl=int(os.getenv('CACHE_META_TTL', str(7 * 86400))),
+            url_ttl=int(os.getenv('CACHE_URL_TTL', str(4 * 3600)))
+        )
+        # Disk-tier lookups, so a cache hit never waits for a yt-dlp worker
+        self.cache_reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cache-read')
+
+        # Spotify/Deezer links list tracks by title and artist, matched to videos as they come up
+        self.metadata = MetadataClient(
+            spotify_id=os.getenv('SPOTIFY_CLIENT_ID'),
+            spotify_secret=os.getenv('SPOTIFY_CLIENT_SECRET')
+        )
+        self.eager_matches = int(os.getenv('METADATA_EAGER_MATCHES', '3'))
+        self.matching = set()  # Background match tasks
+
+        # Radio stations: one shared stream per station, fanned out to every guild tuned in
+        self.stations = {}
+        for entry in filter(None, os.getenv('RADIO_STATIONS', '').split(',')):
+            name, url = entry.strip().split('=', 1)
+            self.stations[name.lower()] = Station(
+                name.lower(), url,
+                buffer_frames=int(os.getenv('RADIO_BUFFER_FRAMES', '10')),
+                idle_timeout=int(os.getenv('RADIO_IDLE_TIMEOUT', '60'))
+            )
+        self.tuned = {}  # Guild ID -> Station it listens to
+        self.station_starts = {}  # Station name -> task starting its broadcast
+        self.station_tasks = set()  # Preloads and playlist loading
+
+        # Titles of every resolved track, so repeated searches skip yt-dlp
+        self.search_index = SearchIndex(os.getenv('SEARCH_INDEX_PATH', 'search.db'))
+
+        # Keeps upcoming songs resolved so track changes start instantly
+        self.prefetcher = Prefetcher(
+            self.queues,
+            lambda song, margin, guild_id: self.resolve_song(song, margin, guild_id, BACKGROUND),
+            depth=int(os.getenv('PREFETCH_DEPTH', '3')),
+            margin=int(os.getenv('PREFETCH_MARGIN', '600')),
+            warm=os.getenv('PREFETCH_WARM', '0') == '1'
+        )
+
+        # Playback state snapshots, restored after a restart
+        self.snapshots = SnapshotStore(os.getenv('SNAPSHOT_PATH', 'snapshot.db'))
+        self.snapshot_interval = float(os.getenv('SNAPSHOT_INTERVAL', '5'))
+        self.restore_join_delay = float(os.getenv('RESTORE_JOIN_DELAY', '1'))
+        self.resume_at = {}  # Guild ID -> (song, position) to resume a restored song from
+        self.restored = False
+        self.paused_at = {}  # Guild ID -> monotonic time playback was paused
+        self.pause_restart = float(os.getenv('PAUSE_RESTART_SECONDS', '120'))
+
+        # Each guild's playback runs as a single actor with a command mailbox
+        self.players = {}  # Guild ID -> GuildPlayer
+        self.player_handlers = {
+            'advance': self.play_next,
+            'track_started': self.track_started,
+            'preload': self.preload_next,
+            'skip': self._skip,
+            'stop': self._stop,
+            'jump': self._jump,
+            'volume': self._set_volume,
+            'filters': self._apply_filters,
+            'seek': self._seek,
+            'radio_ended': self._radio_ended,
+        }
+
+        # One scheduler disconnects idle guilds and frees their state
+        self.idle_reaper = IdleReaper(
+            self.reap_idle,
+            timeout=int(os.getenv('IDLE_TIMEOUT', '300'))
+        )
+
+        self.setup_metrics()
+
+    def setup_metrics(self):
+        """Create the hot-path metrics and export existing stats"""
+        registry = self.metrics = metrics.Registry()
+        self.metrics_port = int(os.getenv('METRICS_PORT', '9108'))
+        self.metrics_runner = None
+        self.loop_lag_task = None
+        self.play_requested = {}  # Guild ID -> perf_counter time of the !play that started playback
+
+        self.search_latency = registry.histogram(
+            'search_seconds', 'Time to resolve a play query', labels=('cache', 'kind')
+        )
+        self.first_audio_latency = registry.histogram(
+            'first_audio_seconds', 'Time from a play command to the first audio frame'
+        )
+        self.spawn_latency = registry.histogram(
+            'ffmpeg_spawn_seconds', 'Time to start an FFmpeg decoder process'
+        )
+        self.gap_latency = registry.histogram(
+            'track_gap_seconds', 'Silence between consecutive tracks'
+        )
+        self.dsp_latency = registry.histogram(
+            'dsp_frame_seconds', 'Time the filter chain spends on one frame',
+            buckets=(0.00002, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005)
+        )
+        self.extraction_wait = registry.histogram(
+            'extraction_wait_seconds', 'Time an extraction waited for a worker', labels=('priority',)
+        )
+        self.extractor.observe_wait = lambda priority, waited: self.extraction_wait.labels(priority).observe(waited)
+        self.loop_lag = registry.histogram(
+            'event_loop_lag_seconds', 'How late the event loop wakes up from a sleep'
+        )
+        self.loop_lag_last = registry.gauge(
+            'event_loop_lag_last_seconds', 'Most recent event loop lag sample'
+        )
+        registry.gauge('voice_clients', 'Connected voice clients',
+                       callback=lambda: len(self.voice_clients))
+        registry.gauge('ffmpeg_processes', 'Running FFmpeg decoders',
+                       callback=lambda: PrebufferedSource.active)
+        registry.gauge('queues', 'Guild queues held in memory',
+                       callback=lambda: len(self.queues))
+        registry.gauge('extractor_queue_depth', 'Extractions waiting for a worker',
+                       callback=lambda: self.extractor.queue_depth)
+        registry.gauge('extractor_active', 'Extractions currently running',
+                       callback=lambda: self.extractor.active)
+        registry.gauge('extractor_wait_seconds_avg', 'Mean time extractions waited for a worker',
+                       callback=lambda: self.extractor.average_wait)
+        registry.gauge('cache_hit_ratio', 'Track cache hit ratio',
+                       callback=self.cache.hit_ratio)
+
+        registry.add_collector('cache', lambda: self.cache.stats)
+        registry.add_collector('extractor', lambda: self.extractor.stats)
+        registry.add_collector('prefetch', lambda: self.prefetcher.stats)
+        registry.add_collector('sources', lambda: self.source_stats)
+        registry.add_collector('admission', lambda: self.stream_budget.stats)
+        registry.gauge('host_cpu_ratio', 'Host CPU utilisation seen by stream admission',
+                       callback=lambda: self.stream_budget.cpu)
+        registry.add_collector('transitions', lambda: self.transition_stats)
+        registry.add_collector('snapshot', lambda: self.snapshots.stats)
+        registry.add_collector('idle', lambda: self.idle_reaper.stats)
+        registry.add_collector('logging', logs.stats)
+        registry.add_collector('startup', lambda: startup.timer.phases)
+        registry.add_collector('metadata', lambda: self.metadata.stats)
+        registry.add_collector('radio', lambda: {
+            'stations': sum(1 for station in self.stations.values() if station.running),
+            'listeners': sum(len(station.listeners) for station in self.stations.values()),
+            'frames': sum(station.stats['frames'] for station in self.stations.values()),
+            'silent_frames': sum(station.stats['silent_frames'] for station in self.stations.values()),
+            'dropped_frames': sum(station.stats['dropped'] for station in self.stations.values()),
+        })
+        registry.add_collector('search_index', lambda: {**self.search_index.stats, 'tracks': len(self.search_index)})
+        if self.audio_cache:
+            registry.add_collector('audio_cache', lambda: {
+                **self.audio_cache.stats,
+                'bytes': self.audio_cache.total_bytes,
+                'hit_ratio': self.audio_cache.hit_ratio(),
+            })
+
+    async def cog_load(self):
+        self.prefetcher.start()
+        self.idle_reaper.start()
+        asyncio.create_task(self.search_index.load())
+        self.index_loop.start()
+        self.loop_lag_task = asyncio.create_task(
+            metrics.monitor_loop_lag(self.loop_lag, self.loop_lag_last)
+        )
+        self.budget_task = asyncio.create_task(self.stream_budget.monitor())
+        if self.metrics_port:
+            # Every cluster process gets its own port
+            port = self.metrics_port + int(os.getenv('CLUSTER_ID', '0'))
+            try:
+                host = os.getenv('METRICS_HOST', '127.0.0.1')
+                self.metrics_runner = await metrics.start_server(self.metrics, host=host, port=port)
+                logger.info(f"📈 Metrics on http://{host}:{port}/metrics")
+            except OSError as e:
+                logger.error(f"Could not start metrics endpoint: {e}")
+        self.snapshot_loop.change_interval(seconds=self.snapshot_interval)
+        if self.extractor_warmup == 'eager':
+            await self.warm_extractor()
+
+    async def cog_unload(self):
+        self.snapshot_loop.cancel()
+        self.index_loop.cancel()
+        self.idle_reaper.stop()
+        if self.loop_lag_task:
+            self.loop_lag_task.cancel()
+        if self.budget_task:
+            self.budget_task.cancel()
+        if self.metrics_runner:
+            await self.metrics_runner.cleanup()
+        for player in self.players.values():
+            player.close()
+        for guild_id in list(self.expansions):
+            self.cancel_expansions(guild_id)
+        await self.prefetcher.stop()
+        self.extractor.shutdown()
+        self.cache_reader.shutdown(wait=True)
+        self.cache.close()
+        self.snapshots.close()
+        self.search_index.close()
+        for task in self.matching | self.station_tasks:
+            task.cancel()
+        for station in self.stations.values():
+            station.stop()
+        await self.metadata.close()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # on_ready fires again after reconnects - only restore once
+        if self.restored:
+            return
+        self.restored = True
+        if self.extractor_warmup == 'background':
+            asyncio.create_task(self.warm_extractor())
+        await self.restore_state()
+        self.snapshot_loop.start()
+
+    async def warm_extractor(self):
+        """Load yt-dlp ahead of the first search, which would otherwise wait for it"""
+        started = time.perf_counter()
+        try:
+            await self.extractor.warm()
+        except Exception as e:
+            logger.warning(f"Extractor warm-up failed: {e}")
+            return
+        elapsed = time.perf_counter() - started
+        startup.timer.record('extractor_warmup', elapsed)
+        logger.info(f"Extractor warmed up in {elapsed * 1000:.0f}ms")
+
+    @tasks.loop(seconds=5)
+    async def snapshot_loop(self):
+        """Save the state of every active guild"""
+        states, removed = [], []
+        for guild_id, queue in self.queues.items():
+            voice_client = self.voice_clients.get(guild_id)
+            if voice_client and (queue.current or not queue.is_empty()):
+                states.append(self.snapshots.capture(
+                    guild_id, voice_client.channel.id, queue, self.playback_position(guild_id)
+                ))
+            elif self.snapshots.forget(guild_id):
+                removed.append(guild_id)
+
+        for guild_id in self.snapshots.tracked():
+            if guild_id not in self.queues:
+                self.snapshots.forget(guild_id)
+                removed.append(guild_id)
+
+        try:
+            # Also retries deletes that failed before
+            await self.snapshots.save(states, removed)
+        except Exception as e:
+            # e.g. 'database is locked' - the loop must keep running, the next save retries
+            logger.error(f"Snapshot failed: {e}")
+
+    @tasks.loop(seconds=30)
+    async def index_loop(self):
+        """Write newly indexed tracks to disk"""
+        try:
+            await self.search_index.save()
+        except Exception as e:
+            # The loop must keep running; unsaved tracks are retried next time
+            logger.error(f"Saving the search index failed: {e}")
+
+    @index_loop.error
+    async def index_error(self, error):
+        logger.error(f"Saving the search index failed: {error}")
+
+    @snapshot_loop.error
+    async def snapshot_error(self, error):
+        logger.error(f"Snapshot failed: {error}")
+
+    async def restore_state(self):
+        """Rejoin voice channels and rebuild the queues saved before a restart"""
+        try:
+            states = await self.snapshots.load()
+        except Exception as e:
+            logger.error(f"Could not load snapshots: {e}")
+            return
+
+        failed = []
+        for state in states:
+            guild_id = state['guild_id']
+            if self.bot.get_guild(guild_id) is None:
+                continue  # Handled by another shard process
+            channel = self.bot.get_channel(state['channel_id'])
+            if (not isinstance(channel, discord.VoiceChannel) or guild_id in self.voice_clients
+                    or not any(not member.bot for member in channel.members)):
+                failed.append(guild_id)
+                continue
+
+            # Songs come back unresolved and are re-resolved lazily near the head of the queue
+            queue = self.get_queue(guild_id)
+            for record in state['songs']:
+                queue.add(Song.from_record(record))
+            if state['current']:
+                song = Song.from_record(state['current'])
+                queue.insert(0, song)
+                self.resume_at[guild_id] = (song, state['position'])
+
+            try:
+                self.voice_clients[guild_id] = await channel.connect()
+            except Exception as e:
+                logger.warning(f"Could not rejoin {channel}: {e}")
+                queue.clear()
+                self.resume_at.pop(guild_id, None)
+                failed.append(guild_id)
+                continue
+
+            self.get_player(guild_id).send('advance')
+            logger.info(f"Restored {len(queue)} songs in {channel.guild}")
+            # Spread rejoins out instead of reconnecting everywhere at once
+            await asyncio.sleep(self.restore_join_delay)
+
+        if failed:
+            await self.snapshots.save([], failed)
+
+    def playback_position(self, guild_id):
+        """Seconds into the current song, from the frames sent so far"""
+        voice_client = self.voice_clients.get(guild_id)
+        sequence = voice_client.source if voice_client else None
+        current = sequence.current if isinstance(sequence, TrackSequence) else None
+        return current.position if current is not None else 0.0
 
     def get_queue(self, guild_id):
         """Get or create queue for guild"""
         if guild_id not in self.queues:
             self.queues[guild_id] = MusicQueue()
+            if guild_id not in self.voice_clients:
+                # Make sure queues of guilds that never play are evicted too
+                self.idle_reaper.touch(guild_id)
         return self.queues[guild_id]
 
-    async def search_song(self, query):
-        """Search for a song and return Song object"""
-        try:
-            # Extract info without downloading
-            info = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self.ytdl.extract_info(query, download=False)
+    def touch_if_idle(self, guild_id):
+        """Restart a guild's idle countdown unless something is playing"""
+        voice_client = self.voice_clients.get(guild_id)
+        if voice_client and (voice_client.is_playing() or voice_client.is_paused()):
+            return
+        self.idle_reaper.touch(guild_id)
+
+    def get_player(self, guild_id):
+        """Get or create the playback actor for guild"""
+        player = self.players.get(guild_id)
+        if player is None:
+            player = self.players[guild_id] = GuildPlayer(
+                guild_id, self.player_handlers,
+                coalesced=('advance', 'preload', 'volume', 'filters', 'seek')
             )
-            
-            if 'entries' in info:
-                # Playlist
-                songs = []
-                for entry in info['entries'][:50]:  # Limit to 50 songs
-                    if entry:
-                        song = Song(
-                            title=entry.get('title', 'Unknown'),
-                            url=entry.get('url'),
-                            duration=entry.get('duration', 0),
-                            thumbnail=entry.get('thumbnail'),
-                            uploader=entry.get('uploader', 'Unknown')
-                        )
-                        songs.append(song)
-                return songs
-            else:
-                # Single song
-                song = Song(
-                    title=info.get('title', 'Unknown'),
-                    url=info.get('url'),
-                    duration=info.get('duration', 0),
-                    thumbnail=info.get('thumbnail'),
-                    uploader=info.get('uploader', 'Unknown')
-                )
-                return [song]
-                
+        return player
+
+    async def reap_idle(self, guild_ids):
+        """Disconnect a batch of idle guilds and free their state"""
+        disconnects = []
+        for guild_id in guild_ids:
+            voice_client = self.voice_clients.get(guild_id)
+            if voice_client and (voice_client.is_playing() or voice_client.is_paused()):
+                continue
+
+            if voice_client:
+                del self.voice_clients[guild_id]
+                disconnects.append(voice_client.disconnect())
+            self.cancel_expansions(guild_id)
+            player = self.players.pop(guild_id, None)
+            if player:
+                player.close()
+            self.queues.pop(guild_id, None)
+            self.queue_pages.pop(guild_id, None)
+            self.paused_at.pop(guild_id, None)
+            self.resume_at.pop(guild_id, None)
+            self.ended_at.pop(guild_id, None)
+            self.play_requested.pop(guild_id, None)
+            self.volumes.pop(guild_id, None)
+            self.filters.pop(guild_id, None)
+            self.equalizers.pop(guild_id, None)
+            self.extractor.forget(guild_id)
+            self.tuned.pop(guild_id, None)
+
+        await asyncio.gather(*disconnects, return_exceptions=True)
+
+    def _extract(self, ytdl, query):
+        """Run yt-dlp for a query and cache every resolved entry (blocking)"""
+        info = ytdl.extract_info(query, download=False)
+
+        if 'entries' in info:
+            # Search results
+            entries = [entry for entry in info['entries'] if entry]
+        else:
+            entries = [info]
+
+        entries = [self.cache.put_track(entry) for entry in entries]
+        self.cache.put_query(query, [entry['id'] for entry in entries if entry['id']])
+        return entries
+
+    def _extract_page(self, ytdl, query, start, count):
+        """Flat-extract one page of a playlist URL (blocking).
+
+        Returns (True, flat entries) for a playlist, or (False, [entry]) when
+        the URL turned out to be a single track.
+        """
+        ytdl.params['playlist_items'] = f"{start}-{start + count - 1}"
+        try:
+            info = ytdl.extract_info(query, download=False)
+        finally:
+            del ytdl.params['playlist_items']
+
+        if 'entries' not in info:
+            return False, [self.cache.put_track(info)]
+        return True, [entry for entry in info['entries'] if entry]
+
+    def _refresh(self, ytdl, entry):
+        """Re-extract a cached entry whose stream URL went stale (blocking)"""
+        info = ytdl.extract_info(entry.get('webpage_url') or entry['id'], download=False)
+        return self.cache.put_track(info)
+
+    def _match(self, ytdl, song):
+        """Find the video that plays a metadata-only track, remembering the match (blocking)"""
+        video_id = self.cache.get_match(song.source)
+        if video_id is None:
+            entries, _ = self._resolve(ytdl, song.search_query)
+            if not entries or not entries[0].get('id'):
+                raise ValueError(f"No match found for {song.title}")
+            video_id = entries[0]['id']
+            self.cache.put_match(song.source, video_id)
+        song.video_id = video_id
+
+    def _refresh_song(self, ytdl, song, margin):
+        """Fill in a stream URL valid for at least ``margin`` seconds (blocking)"""
+        if not song.video_id and song.source:
+            self._match(ytdl, song)
+        entry = self.cache.get_track(song.video_id) if song.video_id else None
+        if not entry or not entry['url'] or entry['url_expires'] - margin <= time.time():
+            entry = self._refresh(ytdl, {'id': song.video_id, 'webpage_url': song.webpage_url})
+        song.update(entry)
+
+    def _cached_entries(self, query, memory_only=False):
+        """Return a query's cached entries if every stream URL is still fresh, else None"""
+        video_ids = self.cache.get_query(query, memory_only)
+        if not video_ids:
+            return None
+        entries = [self.cache.get_track(video_id, memory_only) for video_id in video_ids]
+        if all(entries) and all(entry['url'] for entry in entries):
+            return entries
+        return None
+
+    def _resolve(self, ytdl, query):
+        """Resolve a query to info dicts, preferring the cache (blocking).
+
+        Returns (entries, 'hit' / 'refresh' / 'miss').
+        """
+        video_ids = self.cache.get_query(query)
+        if video_ids:
+            entries = [self.cache.get_track(video_id) for video_id in video_ids]
+            if all(entries):
+                if all(entry['url'] for entry in entries):
+                    return entries, 'hit'
+                # Metadata is fresh - only refresh stream URLs that expired
+                return [entry if entry['url'] else self._refresh(ytdl, entry) for entry in entries], 'refresh'
+        return self._extract(ytdl, query), 'miss'
+
+    async def search_song(self, query, guild_id=None):
+        """Search for a song and return (songs, next playlist index or None)"""
+        started = time.perf_counter()
+        try:
+            link = parse_link(query)
+            if link:
+                # Metadata-only link - songs are matched to videos as they come up
+                songs, next_page = await self.fetch_metadata(link, guild_id)
+                kind = 'single' if link[1] == 'track' else 'playlist'
+                self.search_latency.labels('metadata', kind).observe(time.perf_counter() - started)
+                return songs, next_page
+
+            key = normalize_query(query)
+            if key.startswith('q:'):
+                match = self.search_index.best_match(query)
+                if match:
+                    # A track we resolved before - look it up by ID instead of searching
+                    entry = self.cache.get_track(match.video_id, memory_only=True)
+                    if entry and entry['url']:
+                        self.search_latency.labels('index', 'single').observe(time.perf_counter() - started)
+                        return [Song.from_info(entry)], None
+                    query = f"https://www.youtube.com/watch?v={match.video_id}"
+                    key = normalize_query(query)
+
+            if key.startswith(('q:', 'yt:')):
+                # Search text or a single YouTube video. Cache hits don't wait for a yt-dlp
+                # worker: the memory tier is read here, the disk tier on the cache reader
+                entries = self._cached_entries(query, memory_only=True)
+                if entries is None:
+                    entries = await asyncio.get_running_loop().run_in_executor(
+                        self.cache_reader, self._cached_entries, query
+                    )
+                if entries is not None:
+                    cache_state = 'hit'
+                else:
+                    entries, cache_state = await self.extractor.run(
+                        key, lambda ytdl: self._resolve(ytdl, query), guild_id=guild_id
+                    )
+                self.search_latency.labels(cache_state, 'single').observe(time.perf_counter() - started)
+                songs = [Song.from_info(entry) for entry in entries]
+                self.index_songs(songs)
+                return songs, None
+
+            # Any other URL may be a playlist - only list its first page
+            is_playlist, entries = await self.fetch_playlist_page(query, 1, guild_id)
+            kind = 'playlist' if is_playlist else 'single'
+            self.search_latency.labels('miss', kind).observe(time.perf_counter() - started)
+            if not is_playlist:
+                songs = [Song.from_info(entry) for entry in entries]
+                self.index_songs(songs)
+                return songs, None
+
+            songs = [Song.from_flat(entry) for entry in entries]
+            self.index_songs(songs)
+            more = len(entries) == self.playlist_page_size
+            return songs, (self.playlist_page_size + 1 if more else None)
+
         except Exception as e:
             logger.error(f"Error searching for song: {e}")
             raise e
 
+    async def fetch_metadata(self, link, guild_id=None):
+        """Return (placeholder songs, next page URL or None) for a Spotify/Deezer link"""
+        service, kind, item_id = link
+        tracks, next_page = await self.metadata.fetch(service, kind, item_id)
+        if not tracks:
+            raise ValueError("No playable tracks found")
+        songs = [Song.from_metadata(track) for track in tracks]
+        self.match_eagerly(songs, guild_id)
+        return songs, next_page
+
+    def match_eagerly(self, songs, guild_id):
+        """Start matching the first few songs so playback can begin right away"""
+        for number, song in enumerate(songs[:self.eager_matches]):
+            priority = INTERACTIVE if number == 0 else BACKGROUND
+            task = asyncio.create_task(self._match_song(song, guild_id, priority))
+            self.matching.add(task)
+            task.add_done_callback(self.matching.discard)
+
+    async def _match_song(self, song, guild_id, priority):
+        try:
+            await self.resolve_song(song, guild_id=guild_id, priority=priority)
+        except Exception as e:
+            logger.warning(f"Could not match {song.title}: {e}", extra={'guild_id': guild_id})
+
+    async def iter_metadata(self, service, url):
+        """Yield the remaining pages of a Spotify/Deezer album or playlist"""
+        count = 0
+        while url and count <= self.playlist_max_entries:
+            tracks, url = await self.metadata.next_page(service, url)
+            count += len(tracks)
+            if tracks:
+                yield [Song.from_metadata(track) for track in tracks]
+
+    def index_songs(self, songs):
+        """Add resolved songs to the local search index"""
+        for song in songs:
+            self.search_index.add(song)
+
+    async def fetch_playlist_page(self, query, start, guild_id=None, priority=INTERACTIVE):
+        """Flat-extract one page of playlist entries starting at ``start``"""
+        key = f"page:{normalize_query(query)}:{start}"
+        return await self.extractor.run(
+            key,
+            lambda ytdl: self._extract_page(ytdl, query, start, self.playlist_page_size),
+            profile='flat',
+            guild_id=guild_id,
+            priority=priority
+        )
+
+    async def iter_playlist(self, query, start, guild_id=None):
+        """Yield the remaining pages of a playlist as lists of placeholder songs"""
+        while start <= self.playlist_max_entries:
+            try:
+                _, entries = await self.fetch_playlist_page(query, start, guild_id, BULK)
+            except ExtractorBusy:
+                await asyncio.sleep(2)
+                continue
+
+            if entries:
+                songs = [Song.from_flat(entry) for entry in entries]
+                self.index_songs(songs)
+                yield songs
+            if len(entries) < self.playlist_page_size:
+                return
+            start += self.playlist_page_size
+
+    def playlist_pages(self, query, start, guild_id=None):
+        """Iterate over the pages of a playlist after the first one"""
+        link = parse_link(query)
+        if link:
+            return self.iter_metadata(link[0], start)
+        return self.iter_playlist(query, start, guild_id)
+
+    async def expand_playlist(self, guild_id, query, start):
+        """Append the rest of a playlist to a guild's queue in the background"""
+        queue = self.get_queue(guild_id)
+        try:
+            async for songs in self.playlist_pages(query, start, guild_id):
+                for song in songs:
+                    queue.add(song)
+                self.prefetcher.poke(guild_id)
+        except Exception as e:
+            logger.warning(f"Stopped expanding playlist {query}: {e}")
+
+    def start_expansion(self, guild_id, query, start):
+        """Track a background playlist expansion so it can be cancelled"""
+        task = asyncio.create_task(self.expand_playlist(guild_id, query, start))
+        tasks = self.expansions.setdefault(guild_id, set())
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    def cancel_expansions(self, guild_id):
+        """Stop adding playlist pages to a guild's queue"""
+        for task in self.expansions.pop(guild_id, ()):
+            task.cancel()
+
+    async def resolve_song(self, song, margin=0, guild_id=None, priority=INTERACTIVE):
+        """Make sure a queued song has a fresh stream URL"""
+        if song.is_fresh(margin):
+            return
+        if self.audio_cache and self.audio_cache.has(song.video_id):
+            return  # Played from disk, no stream URL needed
+        if not song.video_id and not song.webpage_url and not song.source:
+            raise ValueError(f"Cannot re-resolve {song.title}")
+        key = f"refresh:{song.video_id or song.webpage_url or song.source}"
+        await self.extractor.run(
+            key, lambda ytdl: self._refresh_song(ytdl, song, margin), guild_id=guild_id, priority=priority
+        )
+
+    def needs_pcm(self, guild_id):
+        """Check whether a guild's audio must be decoded for processing"""
+        return (self.crossfade_frames > 0 or self.volumes.get(guild_id, 1.0) != 1.0
+                or bool(self.filters.get(guild_id)) or any(self.equalizers.get(guild_id, ())))
+
+    def filter_chain(self, guild_id):
+        """Create a guild's DSP stage with its current filters"""
+        chain = FilterChain(observe=self.dsp_latency.observe)
+        sections, speed = build_filters(self.filters.get(guild_id, ()), self.equalizers.get(guild_id, (0, 0, 0)))
+        if sections or speed != 1.0:
+            chain.configure(sections, speed)
+        return chain
+
+    def normalization(self, song):
+        """Return (gain, meter) that bring a song to the target loudness.
+
+        Songs measured before get a fixed gain; new ones get a meter that
+        remembers their loudness for the next time they play. Only the memory
+        tier is read here - track lookups load it off the event loop.
+        """
+        if not self.normalize or not song.video_id:
+            return 1.0, None
+        loudness = self.cache.get_loudness(song.video_id, memory_only=True)
+        if loudness is None:
+            video_id = song.video_id
+            return 1.0, LoudnessMeter(lambda db: self.cache.put_loudness(video_id, db))
+        change = min(self.loudness_target - loudness, self.max_boost)
+        if abs(change) < 1:
+            return 1.0, None  # Close enough to leave untouched
+        return db_to_gain(change), None
+
+    def create_source(self, guild_id, song, start=0):
+        """Spawn a decoder for a song and start buffering its audio"""
+        path = self.audio_cache.lookup(song.video_id) if self.audio_cache else None
+        if path:
+            # Local Opus file - no reconnect options needed
+            location, codec, before_options = path, 'opus', None
+        else:
+            location, codec = song.url, song.codec
+            before_options = self.ffmpeg_options['before_options']
+        if start:
+            before_options = f"{before_options or ''} -ss {start:.2f}".strip()
+
+        gain, meter = self.normalization(song)
+        degraded = self.stream_budget.degraded()
+        if degraded:
+            gain, meter = 1.0, None  # Skip normalization so more streams can be passed through
+        spawn_started = time.perf_counter()
+        if (self.opus_passthrough and codec == 'opus' and not self.needs_pcm(guild_id)
+                and gain == 1.0 and meter is None):
+            # Remux the Opus packets as-is - no decode or re-encode. discord.py maps
+            # codec 'opus' to '-c:a copy'; any other value re-encodes with libopus
+            source = discord.FFmpegOpusAudio(
+                location, codec='opus', before_options=before_options, options='-vn'
+            )
+            self.source_stats['opus_passthrough'] += 1
+        elif degraded and self.opus_passthrough and not self.needs_pcm(guild_id):
+            # Host is busy - FFmpeg encodes straight to low-bitrate Opus, nothing is encoded here
+            source = discord.FFmpegOpusAudio(
+                location, bitrate=self.degraded_bitrate, before_options=before_options, options='-vn'
+            )
+            self.source_stats['degraded'] += 1
+        else:
+            source = discord.FFmpegPCMAudio(
+                location, before_options=before_options, options=self.ffmpeg_options['options']
+            )
+            self.source_stats['pcm'] += 1
+        self.spawn_latency.observe(time.perf_counter() - spawn_started)
+        if source.is_opus():
+            gain, meter = 1.0, None
+        return PrebufferedSource(
+            source, frames=self.prebuffer_frames, song=song, start=start, gain=gain, meter=meter
+        )
+
+    def _download(self, ytdl, song):
+        """Download a track into the audio cache (blocking)"""
+        ytdl.extract_info(song.webpage_url or song.video_id, download=True)
+        self.audio_cache.store(song.video_id)
+
+    async def cache_audio(self, guild_id, song):
+        """Store a hot track in the audio cache in the background"""
+        try:
+            await self.extractor.run(
+                f"download:{song.video_id}",
+                lambda ytdl: self._download(ytdl, song),
+                profile='download',
+                guild_id=guild_id,
+                priority=BULK
+            )
+        except Exception as e:
+            self.audio_cache.discard(song.video_id)
+            logger.warning(f"Could not cache audio for {song.title}: {e}")
+
+    def _playback_ended(self, guild_id, error):
+        """Voice client ``after`` callback - runs on the audio thread"""
+        if error:
+            logger.error(f"Player error: {error}", extra={'guild_id': guild_id})
+        self.ended_at[guild_id] = time.monotonic()
+        player = self.players.get(guild_id)
+        if player:
+            player.send_threadsafe('advance')
+
+    async def track_started(self, guild_id, source, gap):
+        """Bookkeeping once a track delivers its first frame"""
+        song = source.song
+        requested = self.play_requested.pop(guild_id, None)
+        if requested is not None:
+            latency = time.perf_counter() - requested
+            self.first_audio_latency.observe(latency)
+            logger.info(f"First audio for {song.title}",
+                        extra={'guild_id': guild_id, 'latency_ms': round(latency * 1000, 1)})
+        if self.audio_cache and self.audio_cache.record_play(song.video_id):
+            asyncio.create_task(self.cache_audio(guild_id, song))
+
+        queue = self.get_queue(guild_id)
+        if song is not queue.current:
+            # Gapless switch to the preloaded song, which is still queued
+            queue.remove(song)
+            queue.current = song
+            logger.info(f"Now playing: {song.title}", extra={'guild_id': guild_id, 'gapless': True})
+            self.prefetcher.poke(guild_id)
+            self.get_player(guild_id).send('preload')
+
+        if gap is not None:
+            self.gap_latency.observe(gap)
+            stats = self.transition_stats
+            stats['transitions'] += 1
+            stats['gap_total'] += gap
+            stats['gap_max'] = max(stats['gap_max'], gap)
+            stats['gap_last'] = gap
+
+    async def preload_next(self, guild_id):
+        """Start decoding the song at the head of the queue ahead of time"""
+        voice_client = self.voice_clients.get(guild_id)
+        sequence = voice_client.source if voice_client else None
+        if not isinstance(sequence, TrackSequence):
+            return
+
+        queue = self.get_queue(guild_id)
+        upcoming = queue.peek(1)
+        if not upcoming:
+            sequence.set_next(None)
+            return
+
+        song = upcoming[0]
+        if sequence.next_song is song:
+            return
+        if not self.is_playable(song):
+            # Resolve off the actor so skips aren't held up, then try again
+            asyncio.create_task(self._resolve_then_preload(guild_id, song))
+            return
+        sequence.set_next(self.create_source(guild_id, song))
+
+    def is_playable(self, song):
+        """Check whether a song can start without resolving it first"""
+        return song.is_fresh() or bool(self.audio_cache and self.audio_cache.has(song.video_id))
+
+    async def _resolve_then_preload(self, guild_id, song):
+        try:
+            await self.resolve_song(song, guild_id=guild_id, priority=BACKGROUND)
+        except Exception as e:
+            logger.warning(f"Could not preload {song.title}: {e}")
+            return
+        player = self.players.get(guild_id)
+        if player and self.is_playable(song):
+            player.send('preload')
+
     async def play_next(self, guild_id):
-        """Play the next song in queue"""
+        """Play the next song in queue if nothing is playing (player actor only)"""
         queue = self.get_queue(guild_id)
+        voice_client = self.voice_clients.get(guild_id)
+        if not voice_client or voice_client.is_playing() or voice_client.is_paused():
+            return
         
+        player = self.get_player(guild_id)
+        while not queue.is_empty():
+            if not voice_client.is_connected():
+                break  # Nothing can play; keep the queue for when it reconnects
+            self.idle_reaper.cancel(guild_id)
+            song = queue.get_next()
+            self.prefetcher.poke(guild_id)
+            try:
+                # Normally already done by the prefetcher
+                await self.resolve_song(song, guild_id=guild_id)
+            except Exception as e:
+                logger.error(f"Error playing song: {e}", extra={'guild_id': guild_id})
+                continue
+            if self.voice_clients.get(guild_id) is not voice_client or not voice_client.is_connected():
+                queue.insert(0, song)  # Disconnected while resolving
+                break
+            if voice_client.is_playing() or voice_client.is_paused():
+                queue.insert(0, song)  # Something else (e.g. the radio) started while resolving
+                return
+
+            resume = self.resume_at.pop(guild_id, None)
+            start = resume[1] if resume and resume[0] is song else 0
+            sequence = None
+            try:
+                sequence = TrackSequence(
+                    self.create_source(guild_id, song, start),
+                    on_change=lambda s, gap: player.send_threadsafe('track_started', s, gap),
+                    crossfade_frames=self.crossfade_frames,
+                    ended_at=self.ended_at.pop(guild_id, None),
+                    gain=GainStage(self.volumes.get(guild_id, 1.0)),
+                    filters=self.filter_chain(guild_id)
+                )
+                if voice_client.encoder is None:
+                    # discord.py only creates one if the first source is PCM, but a sequence that
+                    # starts with passed-through Opus can switch to PCM at any later track
+                    voice_client.encoder = discord.opus.Encoder()
+                voice_client.play(sequence, after=lambda e: self._playback_ended(guild_id, e))
+                self.stream_budget.release(guild_id)  # Its decoder is counted now
+            except (discord.ClientException, discord.opus.OpusNotLoaded) as e:
+                # The voice client can't play at all - trying the next song would fail the same way
+                if sequence is not None:
+                    sequence.cleanup()
+                queue.insert(0, song)
+                logger.error(f"Could not start playback: {e}", extra={'guild_id': guild_id})
+                break
+            except Exception as e:
+                if sequence is not None:
+                    sequence.cleanup()
+                logger.error(f"Error playing song: {e}", extra={'guild_id': guild_id})
+                continue
+            queue.current = song
+            logger.info(f"Now playing: {song.title}", extra={'guild_id': guild_id})
+            await self.preload_next(guild_id)
+            return
+
         if queue.is_empty():
-            # Auto-disconnect after 5 minutes of inactivity
-            await asyncio.sleep(300)
-            if queue.is_empty() and guild_id in self.voice_clients:
-                await self.voice_clients[guild_id].disconnect()
-                del self.voice_clients[guild_id]
+            queue.current = None  # Finished - not to be snapshotted and replayed after a restart
+        # Auto-disconnect after a period of inactivity
+        self.idle_reaper.touch(guild_id)
+
+    async def _skip(self, guild_id, song):
+        """Skip ``song`` if it is still the one playing (player actor only)"""
+        voice_client = self.voice_clients.get(guild_id)
+        queue = self.get_queue(guild_id)
+        if not voice_client or not voice_client.is_playing() or queue.current is not song:
+            return  # Already moved on - repeated skips of one song count once
+        if isinstance(voice_client.source, TrackSequence):
+            voice_client.source.skip()  # Moves straight on to the preloaded song
+        else:
+            voice_client.stop()  # Ends playback and sends 'advance'
+
+    async def _stop(self, guild_id):
+        """Stop playback and clear the queue (player actor only)"""
+        self.cancel_expansions(guild_id)
+        self.get_queue(guild_id).clear()
+        voice_client = self.voice_clients.get(guild_id)
+        if voice_client:
+            voice_client.stop()
+
+    async def _jump(self, guild_id, index, song):
+        """Drop the songs before ``index`` and skip to it (player actor only)"""
+        queue = self.get_queue(guild_id)
+        if index >= len(queue):
             return
-        
-        song = queue.get_next()
+        queue.jump(index)
+        self.prefetcher.poke(guild_id)
+        await self.preload_next(guild_id)
+        await self._skip(guild_id, song)
+
+    async def _set_volume(self, guild_id, volume):
+        """Apply a volume change (player actor only)"""
+        self.volumes[guild_id] = volume
         voice_client = self.voice_clients.get(guild_id)
-        
-        if voice_client and not voice_client.is_playing():
+        sequence = voice_client.source if voice_client else None
+        if not isinstance(sequence, TrackSequence):
+            return
+        sequence.gain.set_volume(volume)
+        await self._ensure_pcm(guild_id, sequence)
+
+    async def _apply_filters(self, guild_id):
+        """Apply changed filter settings (player actor only)"""
+        voice_client = self.voice_clients.get(guild_id)
+        sequence = voice_client.source if voice_client else None
+        if not isinstance(sequence, TrackSequence):
+            return
+        sections, speed = build_filters(self.filters.get(guild_id, ()), self.equalizers.get(guild_id, (0, 0, 0)))
+        sequence.filters.configure(sections, speed)
+        await self._ensure_pcm(guild_id, sequence)
+
+    async def _ensure_pcm(self, guild_id, sequence):
+        """Restart passed-through Opus tracks as PCM once the guild's audio needs processing"""
+        if not self.needs_pcm(guild_id):
+            return
+        upcoming = sequence.next
+        if upcoming is not None and upcoming.is_opus():
+            sequence.set_next(None)
+            await self.preload_next(guild_id)
+        current = sequence.current
+        if current is not None and current.is_opus():
+            position = self.playback_position(guild_id)
+            sequence.replace(self.create_source(guild_id, current.song, position))
+
+    async def _seek(self, guild_id, song, position):
+        """Restart the decoder of ``song`` at ``position`` seconds (player actor only)"""
+        voice_client = self.voice_clients.get(guild_id)
+        sequence = voice_client.source if voice_client else None
+        if not isinstance(sequence, TrackSequence) or self.get_queue(guild_id).current is not song:
+            return  # Moved on to another song since the seek was requested
+        if song.duration:
+            position = min(position, song.duration - 1)
+        # The stream URL is reused unless it has expired; FFmpeg seeks the input with range requests
+        await self.resolve_song(song, guild_id=guild_id)
+        sequence.replace(self.create_source(guild_id, song, max(position, 0)))
+
+    async def station_source(self, station, index):
+        """Resolve a station's song at ``index``, moving on past ones that fail; returns (index, source)"""
+        for attempt in range(min(len(station.songs), 5)):
+            position = (index + attempt) % len(station.songs)
+            song = station.songs[position]
             try:
-                source = discord.FFmpegPCMAudio(song.url, **self.ffmpeg_options)
-                voice_client.play(source, after=lambda e: asyncio.run_coroutine_threadsafe(
-                    self.play_next(guild_id), self.bot.loop
-                ))
-                queue.current = song
-                logger.info(f"Now playing: {song.title}")
+                await self.resolve_song(song, guild_id=station.key, priority=BACKGROUND)
+                return position, self.create_source(station.key, song)
+            except ExtractorBusy:
+                raise
             except Exception as e:
-                logger.error(f"Error playing song: {e}")
-                await self.play_next(guild_id)
+                logger.warning(f"Station {station.name} skipped {song.title}: {e}")
+        raise ValueError(f"No playable songs on station {station.name}")
+
+    async def start_station(self, station):
+        """Load a station's playlist and start broadcasting its current song"""
+        if not station.songs:
+            songs, next_start = await self.search_song(station.url, station.key)
+            station.songs = list(songs)
+            if next_start is not None:
+                self._station_task(self.load_station(station, next_start))
+        station.position, source = await self.station_source(station, station.position)
+        station.upcoming = None
+        loop = asyncio.get_running_loop()
+        sequence = TrackSequence(
+            source,
+            on_change=lambda s, gap: loop.call_soon_threadsafe(self._station_track_started, station, s)
+        )
+        station.start(sequence)
+        self.stream_budget.release(station.key)
+        logger.info(f"Station {station.name} on air: {source.song.title}")
+
+    async def tune_in(self, station):
+        """Make sure a station is broadcasting, starting it once however many guilds join at the same time"""
+        task = self.station_starts.get(station.name)
+        if task is None:
+            if station.running:
+                return
+            task = self.station_starts[station.name] = asyncio.create_task(self.start_station(station))
+            task.add_done_callback(lambda t: self.station_starts.pop(station.name, None))
+        await asyncio.shield(task)
+
+    async def load_station(self, station, start):
+        """Add the rest of a station's playlist in the background"""
+        try:
+            async for songs in self.playlist_pages(station.url, start, station.key):
+                station.songs.extend(songs)
+        except Exception as e:
+            logger.warning(f"Stopped loading station {station.name} at {len(station.songs)} songs: {e}")
+
+    def _station_task(self, coro):
+        task = asyncio.create_task(coro)
+        self.station_tasks.add(task)
+        task.add_done_callback(self.station_tasks.discard)
+
+    def _station_track_started(self, station, source):
+        """A station moved on to a new song - preload the one after it"""
+        if station.upcoming is not None and station.songs[station.upcoming] is source.song:
+            station.position = station.upcoming
+        station.upcoming = None
+        self._station_task(self.preload_station(station, station.sequence))
+
+    async def preload_station(self, station, sequence):
+        """Start decoding a station's next song, retrying while it stays on air"""
+        while station.running and station.sequence is sequence:
+            try:
+                index, source = await self.station_source(station, station.position + 1)
+            except Exception as e:
+                logger.warning(f"Could not preload station {station.name}: {e}")
+                await asyncio.sleep(30)
+                continue
+            if not station.running or station.sequence is not sequence:
+                source.cleanup()  # Went off air meanwhile
+                return
+            station.upcoming = index
+            sequence.set_next(source)
+            return
+
+    def _listener_ended(self, guild_id, listener, error):
+        """Voice client ``after`` callback for radio listeners - runs on the audio thread"""
+        if error:
+            logger.error(f"Radio player error: {error}", extra={'guild_id': guild_id})
+        player = self.players.get(guild_id)
+        if player:
+            player.send_threadsafe('radio_ended', listener)
+
+    async def _radio_ended(self, guild_id, listener):
+        """Detach a guild whose station stopped playing, e.g. by !skip or !stop (player actor only)"""
+        station = listener.station
+        station.unsubscribe(listener)
+        voice_client = self.voice_clients.get(guild_id)
+        if self.tuned.get(guild_id) is not station or (
+                voice_client and (voice_client.is_playing() or voice_client.is_paused())):
+            return  # Left with !radio leave, or switched to another station
+        del self.tuned[guild_id]
+        await self.play_next(guild_id)  # Back to the queue, or idle until the reaper disconnects
 
     @commands.command(name='play', aliases=['p'])
     async def play(self, ctx, *, query=None):
-        """Play music from YouTube, Spotify, or SoundCloud"""
+        """Play music from YouTube, Spotify, Deezer or SoundCloud"""
         if not query:
             embed = discord.Embed(
                 title="❌ No Query Provided",
@@ -124,6 +1168,8 @@ class Music(commands.Cog):
             await ctx.send(embed=embed)
             return
 
+        requested = time.perf_counter()
+
         # Check if user is in voice channel
         if not ctx.author.voice:
             embed = discord.Embed(
@@ -134,11 +1180,48 @@ class Music(commands.Cog):
             await ctx.send(embed=embed)
             return
 
+        station = self.tuned.get(ctx.guild.id)
+        if station:
+            embed = discord.Embed(
+                title="📻 Listening to the Radio",
+                description=f"This server is tuned in to **{station.name}**. "
+                            f"Use `{ctx.prefix}radio leave` before playing your own music.",
+                color=discord.Color.orange()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        # Starting a new stream needs room on this host; adding to a playing queue doesn't
+        voice_client = self.voice_clients.get(ctx.guild.id)
+        if not voice_client or not (voice_client.is_playing() or voice_client.is_paused()):
+            waiting = []
+
+            async def on_queued():
+                waiting.append(await ctx.send(embed=discord.Embed(
+                    title="⏳ Waiting for a Free Slot",
+                    description="The bot is at capacity right now. Your music will start as soon as a slot frees up.",
+                    color=discord.Color.orange()
+                )))
+
+            if await self.stream_budget.admit(on_queued, key=ctx.guild.id) == REFUSE:
+                embed = discord.Embed(
+                    title="🚦 Bot Busy",
+                    description="The bot is playing in too many servers right now. Please try again in a few minutes.",
+                    color=discord.Color.red()
+                )
+                if waiting:
+                    await waiting[0].edit(embed=embed)
+                else:
+                    await ctx.send(embed=embed)
+                return
+
         # Join voice channel if not already connected
         if ctx.guild.id not in self.voice_clients:
             voice_channel = ctx.author.voice.channel
             voice_client = await voice_channel.connect()
             self.voice_clients[ctx.guild.id] = voice_client
+        # Not idle while searching; every failure below restarts the countdown
+        self.idle_reaper.cancel(ctx.guild.id)
 
         # Search for song
         embed = discord.Embed(
@@ -149,10 +1232,10 @@ class Music(commands.Cog):
         message = await ctx.send(embed=embed)
 
         try:
-            songs = await self.search_song(query)
+            songs, next_start = await self.search_song(query, ctx.guild.id)
             queue = self.get_queue(ctx.guild.id)
             
-            if len(songs) == 1:
+            if len(songs) == 1 and next_start is None:
                 # Single song
                 song = songs[0]
                 queue.add(song)
@@ -165,7 +1248,7 @@ class Music(commands.Cog):
                 if song.thumbnail:
                     embed.set_thumbnail(url=song.thumbnail)
                 embed.add_field(name="Duration", value=song.format_duration(), inline=True)
-                embed.add_field(name="Position in Queue", value=str(len(queue.songs)), inline=True)
+                embed.add_field(name="Position in Queue", value=str(len(queue)), inline=True)
                 
             else:
                 # Playlist
@@ -177,13 +1260,29 @@ class Music(commands.Cog):
                     description=f"Added **{len(songs)}** songs to the queue",
                     color=discord.Color.green()
                 )
+                if next_start is not None:
+                    embed.description += ", loading the rest in the background"
+                    self.start_expansion(ctx.guild.id, query, next_start)
 
             await message.edit(embed=embed)
+            self.prefetcher.poke(ctx.guild.id)
             
-            # Start playing if not already playing
-            voice_client = self.voice_clients[ctx.guild.id]
-            if not voice_client.is_playing():
-                await self.play_next(ctx.guild.id)
+            # Start playing if not already playing, otherwise preload the next song
+            voice_client = self.voice_clients.get(ctx.guild.id)
+            if voice_client and not voice_client.is_playing() and not voice_client.is_paused():
+                self.play_requested[ctx.guild.id] = requested
+            player = self.get_player(ctx.guild.id)
+            player.send('advance')
+            player.send('preload')
+
+        except ExtractorBusy:
+            embed = discord.Embed(
+                title="⏳ Too Busy",
+                description="Too many songs are being looked up right now. Please try again in a moment.",
+                color=discord.Color.orange()
+            )
+            await message.edit(embed=embed)
+            self.touch_if_idle(ctx.guild.id)
 
         except Exception as e:
             embed = discord.Embed(
@@ -192,6 +1291,45 @@ class Music(commands.Cog):
                 color=discord.Color.red()
             )
             await message.edit(embed=embed)
+            self.touch_if_idle(ctx.guild.id)
+
+    @commands.command(name='search', aliases=['find'])
+    async def search(self, ctx, *, query=None):
+        """Search songs played before and pick one to play"""
+        if not query:
+            embed = discord.Embed(
+                title="❌ No Query Provided",
+                description="Please provide a song name to search for.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        results = self.search_index.search(query, limit=10)
+        if not results:
+            embed = discord.Embed(
+                title="🔎 No Matches",
+                description=f"Nothing played before matches `{query}`.\n"
+                            f"Use `play {query}` to search YouTube.",
+                color=discord.Color.orange()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        async def pick(result):
+            self.search_index.record_hit(result.video_id)
+            await ctx.invoke(self.play, query=f"https://www.youtube.com/watch?v={result.video_id}")
+
+        embed = discord.Embed(
+            title="🔎 Search Results",
+            description="\n".join(
+                f"`{number}.` **{result.title}** - {result.uploader}"
+                for number, result in enumerate(results, 1)
+            ),
+            color=discord.Color.blue()
+        )
+        view = SearchPicker(ctx.author, results, pick)
+        view.message = await ctx.send(embed=embed, view=view)
 
     @commands.command(name='pause')
     async def pause(self, ctx):
@@ -200,6 +1338,7 @@ class Music(commands.Cog):
         
         if voice_client and voice_client.is_playing():
             voice_client.pause()
+            self.paused_at[ctx.guild.id] = time.monotonic()
             embed = discord.Embed(
                 title="⏸️ Paused",
                 description="Playback has been paused.",
@@ -220,6 +1359,13 @@ class Music(commands.Cog):
         voice_client = self.voice_clients.get(ctx.guild.id)
         
         if voice_client and voice_client.is_paused():
+            paused_at = self.paused_at.pop(ctx.guild.id, None)
+            if paused_at and time.monotonic() - paused_at > self.pause_restart:
+                # The stream may have timed out or expired - reopen it where we left off
+                queue = self.get_queue(ctx.guild.id)
+                self.get_player(ctx.guild.id).send(
+                    'seek', queue.current, self.playback_position(ctx.guild.id)
+                )
             voice_client.resume()
             embed = discord.Embed(
                 title="▶️ Resumed",
@@ -242,7 +1388,7 @@ class Music(commands.Cog):
         queue = self.get_queue(ctx.guild.id)
         
         if voice_client and voice_client.is_playing():
-            voice_client.stop()  # This will trigger play_next
+            self.get_player(ctx.guild.id).send('skip', queue.current)
             embed = discord.Embed(
                 title="⏭️ Skipped",
                 description="Skipped to the next song.",
@@ -264,8 +1410,7 @@ class Music(commands.Cog):
         queue = self.get_queue(ctx.guild.id)
         
         if voice_client:
-            voice_client.stop()
-            queue.clear()
+            self.get_player(ctx.guild.id).send('stop')
             embed = discord.Embed(
                 title="⏹️ Stopped",
                 description="Playback stopped and queue cleared.",
@@ -281,8 +1426,8 @@ class Music(commands.Cog):
         await ctx.send(embed=embed)
 
     @commands.command(name='queue', aliases=['q'])
-    async def show_queue(self, ctx):
-        """Show the current queue"""
+    async def show_queue(self, ctx, page: int = 1):
+        """Show the current queue, one page at a time"""
         queue = self.get_queue(ctx.guild.id)
         
         if queue.is_empty() and not queue.current:
@@ -294,39 +1439,17 @@ class Music(commands.Cog):
             await ctx.send(embed=embed)
             return
         
-        embed = discord.Embed(
-            title="📝 Music Queue",
-            color=discord.Color.blue()
-        )
-        
-        # Current song
-        if queue.current:
-            embed.add_field(
-                name="🎵 Now Playing",
-                value=f"**{queue.current.title}**\nBy: {queue.current.uploader}",
-                inline=False
-            )
-        
-        # Upcoming songs
-        if not queue.is_empty():
-            upcoming = []
-            for i, song in enumerate(list(queue.songs)[:10]):  # Show first 10
-                upcoming.append(f"`{i+1}.` **{song.title}** - {song.format_duration()}")
-            
-            embed.add_field(
-                name="⏭️ Up Next",
-                value="\n".join(upcoming),
-                inline=False
-            )
-            
-            if len(queue.songs) > 10:
-                embed.add_field(
-                    name="➕ More",
-                    value=f"And {len(queue.songs) - 10} more songs...",
-                    inline=False
-                )
-        
-        await ctx.send(embed=embed)
+        pages = self.queue_pages.get(ctx.guild.id)
+        if pages is None or pages.queue is not queue:
+            pages = self.queue_pages[ctx.guild.id] = QueuePages(queue)
+        page = max(0, min(page - 1, pages.page_count - 1))
+        embed = pages.render(page, self.playback_position(ctx.guild.id))
+
+        if pages.page_count == 1:
+            await ctx.send(embed=embed)
+            return
+        view = QueueView(pages, lambda: self.playback_position(ctx.guild.id), page)
+        view.message = await ctx.send(embed=embed, view=view)
 
     @commands.command(name='nowplaying', aliases=['np'])
     async def now_playing(self, ctx):
@@ -351,12 +1474,71 @@ class Music(commands.Cog):
         
         embed.add_field(name="👤 Uploader", value=song.uploader, inline=True)
         embed.add_field(name="⏱️ Duration", value=song.format_duration(), inline=True)
+
+        position = self.playback_position(ctx.guild.id)
+        if song.duration:
+            filled = min(int(position / song.duration * 20), 19)
+            bar = '▬' * filled + '🔘' + '▬' * (19 - filled)
+            embed.add_field(
+                name="▶️ Progress",
+                value=f"{bar}\n{format_time(position)} / {song.format_duration()}",
+                inline=False
+            )
+        else:
+            embed.add_field(name="▶️ Progress", value=format_time(position), inline=True)
         
         if song.thumbnail:
             embed.set_thumbnail(url=song.thumbnail)
         
         await ctx.send(embed=embed)
 
+    @commands.command(name='seek')
+    async def seek(self, ctx, position=None):
+        """Jump to a time in the current song (1:30, 90, or +15/-15 to move relative)"""
+        voice_client = self.voice_clients.get(ctx.guild.id)
+        queue = self.get_queue(ctx.guild.id)
+
+        embed = None
+        if not (voice_client and queue.current and (voice_client.is_playing() or voice_client.is_paused())):
+            embed = discord.Embed(
+                title="❌ Nothing Playing",
+                description="There's nothing currently playing to seek in.",
+                color=discord.Color.red()
+            )
+        else:
+            try:
+                if position is None:
+                    raise ValueError("No position given")
+                if position[0] in '+-':
+                    offset = parse_time(position[1:])
+                    target = self.playback_position(ctx.guild.id) + (offset if position[0] == '+' else -offset)
+                else:
+                    target = parse_time(position)
+            except ValueError:
+                embed = discord.Embed(
+                    title="❌ Invalid Time",
+                    description="Use a time like `1:30` or `90`, or `+15`/`-15` to move relative.",
+                    color=discord.Color.red()
+                )
+            else:
+                target = max(target, 0)
+                if queue.current.duration and target >= queue.current.duration:
+                    embed = discord.Embed(
+                        title="❌ Invalid Time",
+                        description=f"The song is only {queue.current.format_duration()} long.",
+                        color=discord.Color.red()
+                    )
+
+        if not embed:
+            self.get_player(ctx.guild.id).send('seek', queue.current, target)
+            embed = discord.Embed(
+                title="⏩ Seeked",
+                description=f"Jumped to {format_time(target)}.",
+                color=discord.Color.blue()
+            )
+
+        await ctx.send(embed=embed)
+
     @commands.command(name='volume', aliases=['vol'])
     async def set_volume(self, ctx, volume: int = None):
         """Set the playback volume (1-100)"""
@@ -381,7 +1563,7 @@ class Music(commands.Cog):
         voice_client = self.voice_clients.get(ctx.guild.id)
         
         if voice_client and voice_client.source:
-            voice_client.source.volume = volume / 100
+            self.get_player(ctx.guild.id).send('volume', volume / 100)
             embed = discord.Embed(
                 title="🔊 Volume Set",
                 description=f"Volume set to {volume}%",
@@ -396,6 +1578,83 @@ class Music(commands.Cog):
         
         await ctx.send(embed=embed)
 
+    @commands.command(name='filter', aliases=['filters', 'fx'])
+    async def filter(self, ctx, name=None):
+        """Toggle an audio filter (bassboost, treble, vocal, nightcore, slowed) or clear them with 'off'"""
+        active = self.filters.setdefault(ctx.guild.id, set())
+        if name is None:
+            embed = discord.Embed(
+                title="🎛️ Audio Filters",
+                description=f"Active: {', '.join(sorted(active)) or 'none'}\n"
+                            f"Available: {', '.join(PRESETS)}",
+                color=discord.Color.blue()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        name = name.lower()
+        if name in ('off', 'clear', 'none'):
+            active.clear()
+            description = "All filters turned off."
+        elif name not in PRESETS:
+            embed = discord.Embed(
+                title="❌ Unknown Filter",
+                description=f"Available filters: {', '.join(PRESETS)}",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+        elif name in active:
+            active.discard(name)
+            description = f"Turned off **{name}**."
+        else:
+            if name in SPEED_PRESETS:
+                active -= SPEED_PRESETS  # Only one speed at a time
+            active.add(name)
+            description = f"Turned on **{name}**."
+
+        self.get_player(ctx.guild.id).send('filters')
+        embed = discord.Embed(
+            title="🎛️ Filters Updated",
+            description=f"{description}\nActive: {', '.join(sorted(active)) or 'none'}",
+            color=discord.Color.green()
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name='eq', aliases=['equalizer'])
+    async def equalizer(self, ctx, bass: int = None, mid: int = 0, treble: int = 0):
+        """Set the bass, mid and treble gain in dB (-12 to 12)"""
+        if bass is None:
+            bass, mid, treble = self.equalizers.get(ctx.guild.id, (0, 0, 0))
+            embed = discord.Embed(
+                title="🎚️ Equalizer",
+                description=f"Bass: {bass:+d} dB | Mid: {mid:+d} dB | Treble: {treble:+d} dB",
+                color=discord.Color.blue()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        if any(gain < -12 or gain > 12 for gain in (bass, mid, treble)):
+            embed = discord.Embed(
+                title="❌ Invalid Gain",
+                description="Each band must be between -12 and 12 dB.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        if bass or mid or treble:
+            self.equalizers[ctx.guild.id] = (bass, mid, treble)
+        else:
+            self.equalizers.pop(ctx.guild.id, None)
+        self.get_player(ctx.guild.id).send('filters')
+        embed = discord.Embed(
+            title="🎚️ Equalizer Set",
+            description=f"Bass: {bass:+d} dB | Mid: {mid:+d} dB | Treble: {treble:+d} dB",
+            color=discord.Color.green()
+        )
+        await ctx.send(embed=embed)
+
     @commands.command(name='shuffle')
     async def shuffle_queue(self, ctx):
         """Shuffle the current queue"""
@@ -409,14 +1668,254 @@ class Music(commands.Cog):
             )
         else:
             queue.shuffle()
+            self.prefetcher.poke(ctx.guild.id)
+            self.get_player(ctx.guild.id).send('preload')
             embed = discord.Embed(
                 title="🔀 Queue Shuffled",
-                description=f"Shuffled {len(queue.songs)} songs.",
+                description=f"Shuffled {len(queue)} songs.",
                 color=discord.Color.green()
             )
         
         await ctx.send(embed=embed)
 
+    def _invalid_position(self, queue, *positions):
+        """Return an error embed if any 1-based queue position is out of range"""
+        for position in positions:
+            if position < 1 or position > len(queue):
+                return discord.Embed(
+                    title="❌ Invalid Position",
+                    description=f"Position must be between 1 and {len(queue)}.",
+                    color=discord.Color.red()
+                )
+        return None
+
+    @commands.command(name='remove', aliases=['rm'])
+    async def remove(self, ctx, position: int):
+        """Remove a song from the queue by its position"""
+        queue = self.get_queue(ctx.guild.id)
+        embed = self._invalid_position(queue, position)
+        
+        if not embed:
+            song = queue.remove_at(position - 1)
+            self.prefetcher.poke(ctx.guild.id)
+            self.get_player(ctx.guild.id).send('preload')
+            embed = discord.Embed(
+                title="🗑️ Removed",
+                description=f"Removed **{song.title}** from the queue.",
+                color=discord.Color.blue()
+            )
+        
+        await ctx.send(embed=embed)
+
+    @commands.command(name='move', aliases=['mv'])
+    async def move(self, ctx, source: int, destination: int):
+        """Move a song to a different position in the queue"""
+        queue = self.get_queue(ctx.guild.id)
+        embed = self._invalid_position(queue, source, destination)
+        
+        if not embed:
+            song = queue.move(source - 1, destination - 1)
+            self.prefetcher.poke(ctx.guild.id)
+            self.get_player(ctx.guild.id).send('preload')
+            embed = discord.Embed(
+                title="↕️ Moved",
+                description=f"Moved **{song.title}** to position {destination}.",
+                color=discord.Color.blue()
+            )
+        
+        await ctx.send(embed=embed)
+
+    @commands.command(name='jump', aliases=['skipto'])
+    async def jump(self, ctx, position: int):
+        """Skip straight to a position in the queue"""
+        voice_client = self.voice_clients.get(ctx.guild.id)
+        queue = self.get_queue(ctx.guild.id)
+        embed = self._invalid_position(queue, position)
+        
+        if not embed and not (voice_client and voice_client.is_playing()):
+            embed = discord.Embed(
+                title="❌ Nothing Playing",
+                description="There's nothing currently playing to skip.",
+                color=discord.Color.red()
+            )
+        
+        if not embed:
+            self.get_player(ctx.guild.id).send('jump', position - 1, queue.current)
+            embed = discord.Embed(
+                title="⏭️ Jumped",
+                description=f"Skipped to position {position} in the queue.",
+                color=discord.Color.blue()
+            )
+        
+        await ctx.send(embed=embed)
+
+    @commands.group(name='radio', invoke_without_command=True)
+    async def radio(self, ctx):
+        """List the radio stations"""
+        if not self.stations:
+            embed = discord.Embed(
+                title="📻 No Stations",
+                description="No radio stations are configured.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        lines = []
+        for station in self.stations.values():
+            line = f"**{station.name}** - {len(station.listeners)} listening"
+            if station.now_playing:
+                line += f"\n  ♪ {station.now_playing.title}"
+            lines.append(line)
+        embed = discord.Embed(
+            title="📻 Radio Stations",
+            description="\n".join(lines),
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"Use {ctx.prefix}radio join <name> to tune in")
+        await ctx.send(embed=embed)
+
+    @radio.command(name='join', aliases=['tune'])
+    async def radio_join(self, ctx, name=None):
+        """Tune in to a radio station"""
+        station = self.stations.get((name or '').lower())
+        if not station:
+            embed = discord.Embed(
+                title="❌ Unknown Station",
+                description=f"Use `{ctx.prefix}radio` to see the stations.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        if not ctx.author.voice:
+            embed = discord.Embed(
+                title="❌ Not in Voice Channel",
+                description="You must be in a voice channel to use this command!",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        # Only a station going on air adds decoders; joining one that broadcasts is nearly free
+        if not station.running and await self.stream_budget.admit(key=station.key) == REFUSE:
+            embed = discord.Embed(
+                title="🚦 Bot Busy",
+                description="The bot is playing in too many servers right now. Please try again in a few minutes.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        if ctx.guild.id not in self.voice_clients:
+            voice_client = await ctx.author.voice.channel.connect()
+            self.voice_clients[ctx.guild.id] = voice_client
+        voice_client = self.voice_clients[ctx.guild.id]
+        self.idle_reaper.cancel(ctx.guild.id)
+
+        listener = station.subscribe()
+        try:
+            await self.tune_in(station)
+        except Exception as e:
+            station.unsubscribe(listener)
+            embed = discord.Embed(
+                title="❌ Station Unavailable",
+                description=f"Could not start **{station.name}**.\nError: {str(e)}",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            self.idle_reaper.touch(ctx.guild.id)
+            return
+
+        # Stops this guild's own song or another station; the song resumes when it leaves
+        queue = self.get_queue(ctx.guild.id)
+        if queue.current is not None and ctx.guild.id not in self.tuned:
+            self.resume_at[ctx.guild.id] = (queue.current, self.playback_position(ctx.guild.id))
+            queue.insert(0, queue.current)
+            queue.current = None
+        self.tuned[ctx.guild.id] = station
+        self.get_player(ctx.guild.id)  # Receives 'radio_ended' when the listener stops
+        voice_client.stop()
+        voice_client.play(listener, after=lambda e: self._listener_ended(ctx.guild.id, listener, e))
+
+        embed = discord.Embed(
+            title=f"📻 Tuned in to {station.name}",
+            description=f"Now playing: **{station.now_playing.title}**" if station.now_playing else None,
+            color=discord.Color.green()
+        )
+        embed.set_footer(text=f"{len(station.listeners)} listening · {ctx.prefix}radio leave to stop")
+        await ctx.send(embed=embed)
+
+    @radio.command(name='leave', aliases=['off'])
+    async def radio_leave(self, ctx):
+        """Stop listening to the radio and go back to the queue"""
+        station = self.tuned.pop(ctx.guild.id, None)
+        if not station:
+            embed = discord.Embed(
+                title="❌ Not Tuned In",
+                description="This server isn't listening to a radio station.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        voice_client = self.voice_clients.get(ctx.guild.id)
+        if voice_client:
+            voice_client.stop()  # The listener unsubscribes itself
+        self.get_player(ctx.guild.id).send('advance')  # Back to the queue, or idle
+
+        embed = discord.Embed(
+            title="📻 Left the Radio",
+            description=f"Stopped listening to **{station.name}**.",
+            color=discord.Color.blue()
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name='stats')
+    @commands.has_permissions(administrator=True)
+    async def stats(self, ctx):
+        """Show latency and load figures for the bot"""
+        def ms(histogram, q):
+            value = histogram.quantile(q)
+            if value == float('inf'):
+                return '∞'
+            return f"{value * 1000:.0f}ms" if value >= 0.001 else f"{value * 1000000:.0f}µs"
+
+        embed = discord.Embed(title="📈 Bot Stats", color=discord.Color.blue())
+        for name, histogram in (
+            ("Search", self.search_latency),
+            ("First audio", self.first_audio_latency),
+            ("FFmpeg spawn", self.spawn_latency),
+            ("Track gap", self.gap_latency),
+            ("Event loop lag", self.loop_lag),
+            ("DSP per frame", self.dsp_latency),
+        ):
+            embed.add_field(
+                name=name,
+                value=f"p50 {ms(histogram, 0.5)} / p99 {ms(histogram, 0.99)}",
+                inline=True
+            )
+        mean_wait, max_wait = self.extractor.guild_wait(ctx.guild.id)
+        embed.add_field(
+            name="Load",
+            value=(f"{len(self.voice_clients)} voice clients, {PrebufferedSource.active} decoders\n"
+                   f"Extractor: {self.extractor.active} running, {self.extractor.queue_depth} waiting\n"
+                   f"This server's lookups waited {mean_wait * 1000:.0f}ms on average, "
+                   f"{max_wait * 1000:.0f}ms at most\n"
+                   f"Track cache hit ratio: {self.cache.hit_ratio():.0%}"),
+            inline=False
+        )
+        admission = self.stream_budget.stats
+        embed.add_field(
+            name="Admission",
+            value=(f"Host CPU {self.stream_budget.cpu:.0%}"
+                   f"{' (degraded)' if self.stream_budget.degraded() else ''}\n"
+                   f"{admission['admitted']} admitted, {admission['degraded']} degraded, "
+                   f"{admission['queued']} queued, {admission['refused']} refused"),
+            inline=False
+        )
+        await ctx.send(embed=embed)
+
     @commands.command(name='disconnect', aliases=['dc', 'leave'])
     async def disconnect(self, ctx):
         """Disconnect the bot from the voice channel"""
@@ -425,10 +1924,13 @@ class Music(commands.Cog):
         if voice_client:
             await voice_client.disconnect()
             del self.voice_clients[ctx.guild.id]
+            self.tuned.pop(ctx.guild.id, None)
             
-            # Clear queue
+            # Clear queue and let the reaper free it
+            self.cancel_expansions(ctx.guild.id)
             queue = self.get_queue(ctx.guild.id)
             queue.clear()
+            self.idle_reaper.touch(ctx.guild.id)
             
             embed = discord.Embed(
                 title="👋 Disconnected",
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+ADMIT = 'admit'
+DEGRADE = 'degrade'
+REFUSE = 'refuse'
+
+
+def _cpu_times():
+    """(busy, total) jiffies of all CPUs from /proc/stat, or None where it doesn't exist"""
+    try:
+        with open('/proc/stat') as f:
+            fields = [int(value) for value in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+    return sum(fields) - idle, sum(fields)
+
+
+class StreamBudget:
+    """Host-level admission control for new streams.
+
+    ``count`` returns the decoders running right now. Below ``degrade_cpu``
+    host CPU, new decoders run normally; above it they run in a cheaper
+    mode. Once ``max_decoders`` decoders run or CPU reaches ``max_cpu``,
+    a new stream waits for up to ``queue_timeout`` seconds (policy
+    'queue') or is refused straight away (policy 'refuse'). Streams that
+    are already playing are never cut off.
+    """
+
+    def __init__(self, count, max_decoders=0, max_cpu=0.9, degrade_cpu=0.75, policy='queue',
+                 queue_timeout=20, reservation=10):
+        self.count = count
+        self.max_decoders = max_decoders  # 0 = no limit
+        self.max_cpu = max_cpu  # 0 = no limit
+        self.degrade_cpu = degrade_cpu  # 0 = never degrade
+        self.policy = policy
+        self.queue_timeout = queue_timeout
+        self.reservation = reservation  # Longest an admitted stream counts before its decoder exists
+
+        self.cpu = 0.0  # Host CPU utilisation, 0-1
+        self._last_times = _cpu_times()
+        self._reserved = {}  # Key -> expiry time of admitted streams still being looked up
+        self._waiting = deque()  # Queued admissions, first come first served
+        self.stats = {'admitted': 0, 'degraded': 0, 'queued': 0, 'refused': 0, 'queue_timeouts': 0}
+
+    def sample(self):
+        """Update ``cpu`` from the time since the previous sample"""
+        times = _cpu_times()
+        if times is None:
+            # No /proc - approximate with the load average per core
+            self.cpu = os.getloadavg()[0] / (os.cpu_count() or 1)
+            return
+        if self._last_times is not None:
+            busy = times[0] - self._last_times[0]
+            total = times[1] - self._last_times[1]
+            if total > 0:
+                self.cpu = busy / total
+        self._last_times = times
+
+    async def monitor(self, interval=2.0):
+        """Sample the CPU periodically; run as a background task"""
+        while True:
+            await asyncio.sleep(interval)
+            self.sample()
+
+    def streams(self):
+        """Running decoders plus admitted streams that haven't started one yet"""
+        now = time.monotonic()
+        for key in [key for key, expires in self._reserved.items() if expires <= now]:
+            del self._reserved[key]
+        return self.count() + len(self._reserved)
+
+    def overloaded(self):
+        return bool((self.max_decoders and self.streams() >= self.max_decoders)
+                    or (self.max_cpu and self.cpu >= self.max_cpu))
+
+    def degraded(self):
+        """True while new decoders should run in the cheaper mode"""
+        return bool(self.degrade_cpu and self.cpu >= self.degrade_cpu)
+
+    def release(self, key):
+        """An admitted stream started its decoder, which ``count`` now includes"""
+        self._reserved.pop(key, None)
+
+    def _admit(self, key):
+        self._reserved[key if key is not None else object()] = time.monotonic() + self.reservation
+        if self.degraded():
+            self.stats['degraded'] += 1
+            return DEGRADE
+        self.stats['admitted'] += 1
+        return ADMIT
+
+    async def admit(self, on_queued=None, key=None):
+        """Decide whether a new stream may start, waiting in line if the policy says so.
+
+        ``on_queued`` is awaited once if the stream has to wait. An admitted
+        stream is reserved until ``release(key)`` or the reservation expires.
+        """
+        if not self._waiting and not self.overloaded():
+            return self._admit(key)
+        if self.policy != 'queue':
+            self.stats['refused'] += 1
+            return REFUSE
+
+        self.stats['queued'] += 1
+        if on_queued:
+            await on_queued()
+        ticket = object()
+        self._waiting.append(ticket)
+        deadline = time.monotonic() + self.queue_timeout
+        try:
+            while self._waiting[0] is not ticket or self.overloaded():
+                if time.monotonic() >= deadline:
+                    self.stats['queue_timeouts'] += 1
+                    self.stats['refused'] += 1
+                    return REFUSE
+                await asyncio.sleep(0.25)
+            return self._admit(key)
+        finally:
+            self._waiting.remove(ticket)
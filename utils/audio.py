@@ -0,0 +1,228 @@
+import audioop
+import logging
+import queue
+import threading
+import time
+
+import discord
+
+from utils.dsp import FilterChain, GainStage, scale
+
+logger = logging.getLogger(__name__)
+
+FRAME_SIZE = discord.opus.Encoder.FRAME_SIZE  # Bytes in one 20ms stereo PCM frame
+
+
+class PrebufferedSource(discord.AudioSource):
+    """Reads another AudioSource ahead of playback on a background thread.
+
+    Starting one of these while the previous track is still playing spawns
+    the decoder early, so its first frames are ready before they are needed.
+    PCM frames are fed to ``meter`` and multiplied by ``gain`` (the track's
+    loudness normalization) on the same thread.
+    """
+
+    active = 0  # Decoders currently running, across all guilds
+    _active_lock = threading.Lock()
+
+    def __init__(self, source, frames=150, song=None, start=0, gain=1.0, meter=None):
+        with PrebufferedSource._active_lock:
+            PrebufferedSource.active += 1
+        self._cleaned = False
+        self.source = source
+        self.song = song
+        self.start = start  # Position in the song (seconds) the decoder starts at
+        self.frames = 0  # Frames handed to the player so far
+        self.gain = gain
+        self.meter = meter
+        self.exhausted = False  # The wrapped source has no more frames to give
+
+        self._buffer = queue.Queue(maxsize=frames)
+        self._stopped = threading.Event()
+        self._ended = False
+        self._thread = threading.Thread(target=self._fill, name='prebuffer', daemon=True)
+        self._thread.start()
+
+    def _put(self, frame):
+        while not self._stopped.is_set():
+            try:
+                self._buffer.put(frame, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fill(self):
+        meter, gain = self.meter, self.gain
+        try:
+            while not self._stopped.is_set():
+                frame = self.source.read()
+                if not frame:
+                    if meter:
+                        meter.finish()
+                    break
+                if meter:
+                    meter.add(frame)
+                if gain != 1.0:
+                    frame = scale(frame, gain)
+                if not self._put(frame):
+                    break
+        except Exception as e:
+            logger.error(f"Decoder read failed: {e}")
+        finally:
+            self.exhausted = True
+            self._put(b'')
+
+    def buffered(self):
+        """Number of frames ready to be read without blocking"""
+        return self._buffer.qsize()
+
+    def read(self):
+        while not self._ended:
+            try:
+                frame = self._buffer.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopped.is_set():
+                    break
+                continue
+            if not frame:
+                break
+            self.frames += 1
+            return frame
+        self._ended = True
+        return b''
+
+    @property
+    def position(self):
+        """Seconds into the song, counted from the frames actually played"""
+        return self.start + self.frames * 0.02
+
+    def is_opus(self):
+        return self.source.is_opus()
+
+    def cleanup(self):
+        self._stopped.set()
+        self.source.cleanup()
+        with PrebufferedSource._active_lock:
+            if not self._cleaned:
+                self._cleaned = True
+                PrebufferedSource.active -= 1
+
+
+def crossfade(outgoing, incoming, weight):
+    """Mix two PCM frames, ``weight`` being the share of the outgoing one"""
+    size = max(len(outgoing), len(incoming))
+    outgoing = audioop.mul(outgoing.ljust(size, b'\0'), 2, weight)
+    incoming = audioop.mul(incoming.ljust(size, b'\0'), 2, 1.0 - weight)
+    return audioop.add(outgoing, incoming, 2)
+
+
+class TrackSequence(discord.AudioSource):
+    """Plays prebuffered tracks back to back as one continuous source.
+
+    The next track is loaded with ``set_next`` while the current one plays;
+    when the current track runs out the sequence switches over within the
+    same read call, so the voice client never stops between songs.
+    ``on_change(source, gap)`` is called from the audio thread whenever a
+    track delivers its first frame, ``gap`` being the silence before it in
+    seconds (None for the first track). PCM output goes through the guild's
+    ``filters`` and then its volume, ``gain``.
+    """
+
+    def __init__(self, first, on_change, crossfade_frames=0, ended_at=None, gain=None, filters=None):
+        self.current = first
+        self.next = None
+        self.on_change = on_change
+        self.crossfade_frames = crossfade_frames
+        self.gain = gain or GainStage()
+        self.filters = filters or FilterChain()
+
+        self._lock = threading.Lock()
+        self._ended_at = ended_at  # monotonic time the previous track ended
+        self._announce = True
+
+    @property
+    def next_song(self):
+        upcoming = self.next
+        return upcoming.song if upcoming else None
+
+    def set_next(self, source):
+        """Replace the preloaded next track (None to drop it)"""
+        with self._lock:
+            old, self.next = self.next, source
+        if old is not None:
+            old.cleanup()
+
+    def replace(self, source):
+        """Swap in a new decoder for the current track, such as one restarted at its position"""
+        with self._lock:
+            old, self.current = self.current, source
+        if old is not None:
+            old.cleanup()
+
+    def skip(self):
+        """End the current track; playback moves on to the preloaded one"""
+        with self._lock:
+            old, self.current = self.current, None
+        if old is not None:
+            self._ended_at = time.monotonic()
+            old.cleanup()
+
+    def _read_frame(self, current, upcoming):
+        frame = current.read()
+        if (self.crossfade_frames and frame and upcoming is not None and current.exhausted
+                and upcoming.buffered() and not current.is_opus() and not upcoming.is_opus()):
+            remaining = current.buffered()
+            if remaining < self.crossfade_frames:
+                incoming = upcoming.read()
+                if incoming:
+                    frame = crossfade(frame, incoming, remaining / self.crossfade_frames)
+        return frame
+
+    def read(self):
+        if self.is_opus():
+            return self._next_frame()
+        if self.filters.active:
+            frame = self.filters.read(self._next_frame)
+        else:
+            frame = self._next_frame()
+        if not frame or self.is_opus():
+            return frame  # Switched to a passed-through Opus track during the read
+        return self.gain.process(frame)
+
+    def _next_frame(self):
+        while True:
+            with self._lock:
+                if self.current is None:
+                    if self.next is None:
+                        return b''
+                    self.current, self.next = self.next, None
+                    self._announce = True
+                current, upcoming = self.current, self.next
+
+            frame = self._read_frame(current, upcoming)
+            if frame:
+                if self._announce:
+                    self._announce = False
+                    gap = time.monotonic() - self._ended_at if self._ended_at else None
+                    self.on_change(current, gap)
+                return frame
+
+            # Current track is over - fall through to the next one
+            with self._lock:
+                if self.current is current:
+                    self.current = None
+            self._ended_at = time.monotonic()
+            current.cleanup()
+
+    def is_opus(self):
+        current = self.current
+        return current.is_opus() if current is not None else False
+
+    def cleanup(self):
+        with self._lock:
+            sources = [self.current, self.next]
+            self.current = self.next = None
+        for source in sources:
+            if source is not None:
+                source.cleanup()
@@ -0,0 +1,142 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+EXTENSION = '.opus'
+
+
+class AudioCache:
+    """Size-bounded on-disk cache of hot tracks, stored as Opus files by video ID.
+
+    Tracks are downloaded once they have been played ``min_plays`` times and
+    evicted least-recently-used (or least-frequently-used) first whenever the
+    cache grows beyond ``max_bytes``. The index lives in memory and is rebuilt
+    from the directory on startup, using file mtimes as last-use times. Play
+    counts of tracks that aren't cached yet are kept for the ``max_tracked``
+    most recently played ones only.
+    """
+
+    def __init__(self, directory, max_bytes, min_plays=2, policy='lru', max_tracked=10000):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_plays = min_plays
+        self.policy = policy
+        self.max_tracked = max_tracked
+
+        self._files = {}    # Video ID -> [size, last_used, hits]
+        self._plays = OrderedDict()  # Video ID -> play count while not cached, oldest play first
+        self._downloading = set()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'bytes_saved': 0,
+            'downloads': 0,
+            'evictions': 0,
+        }
+
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith(EXTENSION):
+                stat = os.stat(os.path.join(directory, name))
+                self._files[name[:-len(EXTENSION)]] = [stat.st_size, stat.st_mtime, 0]
+                self.total_bytes += stat.st_size
+
+    def path_for(self, video_id):
+        """Location of a track's cached file (whether or not it exists)"""
+        return os.path.join(self.directory, video_id + EXTENSION)
+
+    def has(self, video_id):
+        """Check whether a track is cached, without counting a lookup"""
+        return video_id is not None and video_id in self._files
+
+    def lookup(self, video_id):
+        """Return the cached file for a track and count the hit, or None"""
+        with self._lock:
+            entry = self._files.get(video_id) if video_id else None
+            if entry is None or not os.path.exists(self.path_for(video_id)):
+                if entry is not None:
+                    self._drop(video_id)
+                self.stats['misses'] += 1
+                return None
+
+            entry[1] = time.time()
+            entry[2] += 1
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += entry[0]
+
+        path = self.path_for(video_id)
+        try:
+            os.utime(path)  # Persist the last-use time for the next startup
+        except OSError:
+            pass
+        return path
+
+    def record_play(self, video_id):
+        """Count a network play; returns True once the track should be downloaded"""
+        if not video_id:
+            return False
+        with self._lock:
+            if video_id in self._files or video_id in self._downloading:
+                return False
+            plays = self._plays.pop(video_id, 0) + 1
+            if plays < self.min_plays:
+                self._plays[video_id] = plays
+                if len(self._plays) > self.max_tracked:
+                    self._plays.popitem(last=False)
+                return False
+            self._downloading.add(video_id)
+            return True
+
+    def store(self, video_id):
+        """Register a freshly downloaded file and evict down to the budget"""
+        path = self.path_for(video_id)
+        with self._lock:
+            self._downloading.discard(video_id)
+            if not os.path.exists(path):
+                return
+            size = os.path.getsize(path)
+            if video_id in self._files:
+                self.total_bytes -= self._files[video_id][0]
+            self._files[video_id] = [size, time.time(), 0]
+            self.total_bytes += size
+            self.stats['downloads'] += 1
+            self._evict()
+
+    def discard(self, video_id):
+        """Forget a download that failed"""
+        with self._lock:
+            self._downloading.discard(video_id)
+
+    def _drop(self, video_id):
+        size = self._files.pop(video_id)[0]
+        self.total_bytes -= size
+        try:
+            os.remove(self.path_for(video_id))
+        except OSError:
+            pass
+
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        if self.policy == 'lfu':
+            order = sorted(self._files, key=lambda v: (self._files[v][2], self._files[v][1]))
+        else:
+            order = sorted(self._files, key=lambda v: self._files[v][1])
+        for video_id in order:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._drop(video_id)
+            self.stats['evictions'] += 1
+            logger.info(f"Evicted {video_id} from audio cache")
+
+    def hit_ratio(self):
+        """Fraction of lookups served from disk"""
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
@@ -0,0 +1,300 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+
+# Fields kept for every cached track (mirrors the keys of a yt-dlp info dict)
+TRACK_FIELDS = ('id', 'title', 'uploader', 'duration', 'thumbnail', 'webpage_url', 'url', 'acodec')
+
+_YOUTUBE_HOSTS = ('youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com')
+
+
+def extract_video_id(query):
+    """Return the YouTube video ID referenced by a URL, or None"""
+    try:
+        parsed = urlparse(query.strip())
+    except ValueError:
+        return None
+
+    host = (parsed.hostname or '').lower()
+    if host == 'youtu.be':
+        video_id = parsed.path.lstrip('/').split('/')[0]
+        return video_id or None
+    if host in _YOUTUBE_HOSTS:
+        if parsed.path == '/watch':
+            ids = parse_qs(parsed.query).get('v')
+            return ids[0] if ids else None
+        match = re.match(r'^/(?:shorts|embed|live)/([\w-]+)', parsed.path)
+        if match:
+            return match.group(1)
+    return None
+
+
+def normalize_query(query):
+    """Normalize a search string or URL into a cache key"""
+    video_id = extract_video_id(query)
+    if video_id and 'list=' not in query:
+        return f"yt:{video_id}"
+
+    query = query.strip()
+    if re.match(r'^https?://', query, re.IGNORECASE):
+        return query
+    return "q:" + " ".join(query.lower().split())
+
+
+def stream_url_expiry(url, default):
+    """Read the expiry timestamp embedded in a signed stream URL"""
+    if not url:
+        return default
+    try:
+        expire = parse_qs(urlparse(url).query).get('expire')
+        if expire:
+            return min(float(expire[0]), default)
+    except ValueError:
+        pass
+    match = re.search(r'/expire/(\d+)/', url)
+    if match:
+        return min(float(match.group(1)), default)
+    return default
+
+
+class TrackCache:
+    """Two-tier (memory LRU + SQLite) cache of resolved track metadata.
+
+    Static metadata and the signed stream URL have separate TTLs so a stale
+    stream URL can be refreshed without resolving the query again. The
+    memory tier has its own lock, never held during SQLite work, so
+    ``memory_only`` lookups are safe on the event loop.
+    """
+
+    def __init__(self, path='cache.db', max_memory=2048, meta_ttl=7 * 86400,
+                 url_ttl=4 * 3600, url_margin=300):
+        self.max_memory = max_memory
+        self.meta_ttl = meta_ttl
+        self.url_ttl = url_ttl
+        self.url_margin = url_margin  # Treat URLs as stale this long before they expire
+
+        self._tracks = OrderedDict()   # Video ID -> entry dict
+        self._queries = OrderedDict()  # Query key -> (video IDs, expires)
+        self._loudness = OrderedDict()  # Video ID -> measured loudness in dBFS
+        self._matches = OrderedDict()  # Metadata-only track (e.g. 'spotify:ID') -> video ID
+        self._lock = threading.Lock()  # Memory tier
+        self._db_lock = threading.Lock()  # SQLite connection
+
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stale_urls': 0,
+        }
+
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS tracks ('
+            ' id TEXT PRIMARY KEY, data TEXT NOT NULL,'
+            ' meta_expires REAL NOT NULL, url_expires REAL NOT NULL)'
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS queries ('
+            ' key TEXT PRIMARY KEY, ids TEXT NOT NULL, expires REAL NOT NULL)'
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS loudness (id TEXT PRIMARY KEY, db REAL NOT NULL)'
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS matches (source TEXT PRIMARY KEY, id TEXT NOT NULL)'
+        )
+        self._db.commit()
+
+    def _remember(self, store, key, value):
+        """Insert into a memory tier, evicting the least recently used item"""
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > self.max_memory:
+            store.popitem(last=False)
+
+    def get_query(self, query, memory_only=False):
+        """Return the video IDs a query resolved to, or None"""
+        key = normalize_query(query)
+        if key.startswith('yt:'):
+            return [key[3:]]
+
+        now = time.time()
+        with self._lock:
+            cached = self._queries.get(key)
+            if cached and cached[1] > now:
+                self._queries.move_to_end(key)
+                return list(cached[0])
+        if memory_only:
+            return None
+
+        with self._db_lock:
+            row = self._db.execute(
+                'SELECT ids, expires FROM queries WHERE key = ?', (key,)
+            ).fetchone()
+        if row and row[1] > now:
+            ids = json.loads(row[0])
+            with self._lock:
+                self._remember(self._queries, key, (ids, row[1]))
+            return list(ids)
+        return None
+
+    def put_query(self, query, video_ids):
+        """Remember which video IDs a query resolved to"""
+        key = normalize_query(query)
+        if key.startswith('yt:') or not video_ids:
+            return
+
+        expires = time.time() + self.meta_ttl
+        with self._lock:
+            self._remember(self._queries, key, (list(video_ids), expires))
+        with self._db_lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO queries (key, ids, expires) VALUES (?, ?, ?)',
+                (key, json.dumps(list(video_ids)), expires)
+            )
+            self._db.commit()
+
+    def get_track(self, video_id, memory_only=False):
+        """Return the cached entry for a video ID, or None if unknown/expired.
+
+        The entry's ``url`` is None when only the stream URL has gone stale.
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._tracks.get(video_id)
+            if cached and cached['meta_expires'] > now:
+                self._tracks.move_to_end(video_id)
+                self.stats['memory_hits'] += 1
+                entry = dict(cached)
+            else:
+                entry = None
+        if entry is None:
+            if memory_only:
+                return None
+            with self._db_lock:
+                row = self._db.execute(
+                    'SELECT data, meta_expires, url_expires FROM tracks WHERE id = ?',
+                    (video_id,)
+                ).fetchone()
+            if not row or row[1] <= now:
+                self.stats['misses'] += 1
+                return None
+            cached = json.loads(row[0])
+            cached['meta_expires'] = row[1]
+            cached['url_expires'] = row[2]
+            with self._lock:
+                self._remember(self._tracks, video_id, cached)
+            self.stats['disk_hits'] += 1
+            entry = dict(cached)
+        if not memory_only:
+            # Off the event loop - have the loudness ready for when the track plays
+            self.get_loudness(video_id)
+
+        if entry['url_expires'] - self.url_margin <= now:
+            self.stats['stale_urls'] += 1
+            entry['url'] = None
+        return entry
+
+    def put_track(self, info):
+        """Cache the metadata and stream URL of a resolved yt-dlp entry.
+
+        Returns the normalized entry, including its ``url_expires`` time.
+        """
+        now = time.time()
+        entry = {field: info.get(field) for field in TRACK_FIELDS}
+        entry['meta_expires'] = now + self.meta_ttl
+        entry['url_expires'] = stream_url_expiry(entry['url'], now + self.url_ttl)
+
+        video_id = entry['id']
+        if not video_id:
+            return dict(entry)
+
+        data = {field: entry[field] for field in TRACK_FIELDS}
+        with self._lock:
+            self._remember(self._tracks, video_id, entry)
+        with self._db_lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO tracks (id, data, meta_expires, url_expires)'
+                ' VALUES (?, ?, ?, ?)',
+                (video_id, json.dumps(data), entry['meta_expires'], entry['url_expires'])
+            )
+            self._db.commit()
+        self.get_loudness(video_id)
+        return dict(entry)
+
+    def get_loudness(self, video_id, memory_only=False):
+        """Return the measured loudness of a track in dBFS, or None"""
+        if not video_id:
+            return None
+        with self._lock:
+            loudness = self._loudness.get(video_id)
+            if loudness is not None:
+                self._loudness.move_to_end(video_id)
+                return loudness
+        if memory_only:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                'SELECT db FROM loudness WHERE id = ?', (video_id,)
+            ).fetchone()
+        if row:
+            with self._lock:
+                self._remember(self._loudness, video_id, row[0])
+            return row[0]
+        return None
+
+    def put_loudness(self, video_id, loudness):
+        """Remember the measured loudness of a track - it never changes"""
+        if not video_id:
+            return
+        with self._lock:
+            self._remember(self._loudness, video_id, loudness)
+        with self._db_lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO loudness (id, db) VALUES (?, ?)', (video_id, loudness)
+            )
+            self._db.commit()
+
+    def get_match(self, source):
+        """Return the video ID a metadata-only track was matched to, or None"""
+        with self._lock:
+            video_id = self._matches.get(source)
+            if video_id is not None:
+                self._matches.move_to_end(source)
+                return video_id
+        with self._db_lock:
+            row = self._db.execute(
+                'SELECT id FROM matches WHERE source = ?', (source,)
+            ).fetchone()
+        if row:
+            with self._lock:
+                self._remember(self._matches, source, row[0])
+            return row[0]
+        return None
+
+    def put_match(self, source, video_id):
+        """Remember which video plays a metadata-only track"""
+        with self._lock:
+            self._remember(self._matches, source, video_id)
+        with self._db_lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO matches (source, id) VALUES (?, ?)', (source, video_id)
+            )
+            self._db.commit()
+
+    def hit_ratio(self):
+        """Fraction of track lookups served from either tier"""
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def close(self):
+        """Close the on-disk tier"""
+        with self._db_lock:
+            self._db.close()
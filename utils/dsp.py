@@ -0,0 +1,309 @@
+import math
+import time
+
+import numpy as np
+
+FULL_SCALE = 32768.0
+SILENCE_DB = -60.0  # Frames quieter than this are left out of loudness measurements
+
+
+def scale(frame, gain):
+    """Multiply a 16-bit PCM frame by ``gain`` (a number or per-sample array), clipping the result"""
+    samples = np.frombuffer(frame, dtype='<i2').astype(np.float32)
+    samples *= gain
+    np.clip(samples, -FULL_SCALE, FULL_SCALE - 1, out=samples)
+    return samples.astype('<i2').tobytes()
+
+
+def db_to_gain(db):
+    return 10 ** (db / 20)
+
+
+class LoudnessMeter:
+    """Measures a track's loudness from the PCM frames passed to ``add``.
+
+    Loudness is the mean power of the non-silent frames in dBFS. Once
+    ``seconds`` of audio have been seen, or ``finish`` is called at the end
+    of a shorter track, ``on_done(loudness)`` is called once.
+    """
+
+    def __init__(self, on_done, seconds=30, min_seconds=5):
+        self.on_done = on_done
+        self._needed = int(seconds * 50)
+        self._minimum = int(min_seconds * 50)
+        self._power = 0.0
+        self._frames = 0
+        self._threshold = db_to_gain(SILENCE_DB) ** 2
+        self.done = False
+
+    def add(self, frame):
+        if self.done:
+            return
+        samples = np.frombuffer(frame, dtype='<i2').astype(np.float32) / FULL_SCALE
+        power = float(np.dot(samples, samples)) / len(samples)
+        if power > self._threshold:
+            self._power += power
+            self._frames += 1
+            if self._frames >= self._needed:
+                self.finish()
+
+    def finish(self):
+        """Report the loudness measured so far, if there was enough audio"""
+        if self.done:
+            return
+        self.done = True
+        if self._frames >= self._minimum:
+            self.on_done(10 * math.log10(self._power / self._frames))
+
+
+class GainStage:
+    """Applies a volume to PCM frames, ramping smoothly when it changes.
+
+    ``set_volume`` may be called from any thread; ``process`` runs on the
+    audio thread and moves the applied volume towards the new one by at
+    most ``max_step`` per frame, so changes never click.
+    """
+
+    def __init__(self, volume=1.0, max_step=0.05):
+        self.volume = volume    # Target volume
+        self.applied = volume   # Volume at the end of the last processed frame
+        self.max_step = max_step
+
+    def set_volume(self, volume):
+        self.volume = volume
+
+    def process(self, frame):
+        start, target = self.applied, self.volume
+        if start == target:
+            return frame if target == 1.0 else scale(frame, target)
+
+        end = start + max(-self.max_step, min(self.max_step, target - start))
+        self.applied = end
+        ramp = np.linspace(start, end, len(frame) // 2, dtype=np.float32)
+        return scale(frame, ramp)
+
+
+SAMPLE_RATE = 48000
+FRAME_SAMPLES = 960  # Samples per channel in one 20ms frame
+
+
+def _shelf(kind, freq, gain_db):
+    """Shelving biquad from the Audio EQ Cookbook, as (b0, b1, b2, a1, a2)"""
+    a = 10 ** (gain_db / 40)
+    w0 = 2 * math.pi * freq / SAMPLE_RATE
+    cos = math.cos(w0)
+    alpha = math.sin(w0) / 2 * math.sqrt(2)
+    root = 2 * math.sqrt(a) * alpha
+    sign = 1 if kind == 'lowshelf' else -1
+    b0 = a * ((a + 1) - sign * (a - 1) * cos + root)
+    b1 = sign * 2 * a * ((a - 1) - sign * (a + 1) * cos)
+    b2 = a * ((a + 1) - sign * (a - 1) * cos - root)
+    a0 = (a + 1) + sign * (a - 1) * cos + root
+    a1 = -sign * 2 * ((a - 1) + sign * (a + 1) * cos)
+    a2 = (a + 1) + sign * (a - 1) * cos - root
+    return (b0 / a0, b1 / a0, b2 / a0, a1 / a0, a2 / a0)
+
+
+def _peaking(freq, gain_db, q=1.0):
+    """Peaking EQ biquad from the Audio EQ Cookbook, as (b0, b1, b2, a1, a2)"""
+    a = 10 ** (gain_db / 40)
+    w0 = 2 * math.pi * freq / SAMPLE_RATE
+    cos = math.cos(w0)
+    alpha = math.sin(w0) / (2 * q)
+    a0 = 1 + alpha / a
+    return ((1 + alpha * a) / a0, -2 * cos / a0, (1 - alpha * a) / a0,
+            -2 * cos / a0, (1 - alpha / a) / a0)
+
+
+def biquad(kind, freq, gain_db):
+    if kind == 'peaking':
+        return _peaking(freq, gain_db)
+    return _shelf(kind, freq, gain_db)
+
+
+# Preset name -> EQ bands (kind, frequency, dB) and playback speed
+PRESETS = {
+    'bassboost': {'bands': [('lowshelf', 110, 8)]},
+    'treble': {'bands': [('highshelf', 6000, 6)]},
+    'vocal': {'bands': [('lowshelf', 200, -4), ('peaking', 2500, 4)]},
+    'nightcore': {'speed': 1.25},
+    'slowed': {'speed': 0.8},
+}
+SPEED_PRESETS = {name for name, preset in PRESETS.items() if 'speed' in preset}
+EQ_BANDS = (('lowshelf', 150), ('peaking', 1000), ('highshelf', 5000))  # Bass, mid, treble
+
+
+def build_filters(presets=(), eq=(0, 0, 0)):
+    """Turn active presets and 3-band EQ gains into (biquad sections, speed)"""
+    bands = []
+    speed = 1.0
+    for name in sorted(presets):
+        preset = PRESETS[name]
+        bands.extend(preset.get('bands', ()))
+        speed *= preset.get('speed', 1.0)
+    bands.extend((kind, freq, gain) for (kind, freq), gain in zip(EQ_BANDS, eq) if gain)
+
+    sections = [biquad(*band) for band in bands]
+    boost = max((gain for _, _, gain in bands), default=0)
+    if sections and boost > 0:
+        # Leave headroom for boosted bands instead of clipping
+        pre = db_to_gain(-boost / 2)
+        b0, b1, b2, a1, a2 = sections[0]
+        sections[0] = (b0 * pre, b1 * pre, b2 * pre, a1, a2)
+    return sections, speed
+
+
+class BlockFilter:
+    """A cascade of biquads run on whole frames at once.
+
+    The cascade is turned into one state-space system. The response to a
+    frame is then a convolution with its impulse response, done with an
+    FFT, plus the decay of the state carried over from the previous frame.
+    Both are exact, so no per-sample Python loop runs on the audio thread.
+    """
+
+    def __init__(self, sections, channels=2, length=FRAME_SAMPLES):
+        a, b, c, d = self._state_space(sections)
+        order = len(b)
+        self.length = length
+        self._fft_size = 1 << (2 * length - 1).bit_length()
+
+        impulse = np.empty(length)  # Impulse response h[n]
+        decay = np.empty((length, order))  # Output caused by the initial state, C A^n
+        carry = np.empty((order, length))  # State left by an input sample, A^(N-1-k) B
+        power = np.eye(order)  # A^n
+        response = b.copy()  # A^n B
+        impulse[0] = d
+        for n in range(length):
+            decay[n] = c @ power
+            carry[:, length - 1 - n] = response
+            if n + 1 < length:
+                impulse[n + 1] = c @ response
+            power = a @ power
+            response = a @ response
+
+        self._spectrum = np.fft.rfft(impulse, self._fft_size)
+        self._decay = decay
+        self._carry = carry
+        self._advance = power  # A^N
+        self._state = np.zeros((order, channels))
+
+    @staticmethod
+    def _state_space(sections):
+        """Chain transposed direct form II biquads into one (A, B, C, D) system"""
+        a = np.zeros((0, 0))
+        b = np.zeros(0)
+        c = np.zeros(0)
+        d = 1.0
+        for b0, b1, b2, a1, a2 in sections:
+            sa = np.array([[-a1, 1.0], [-a2, 0.0]])
+            sb = np.array([b1 - a1 * b0, b2 - a2 * b0])
+            sc = np.array([1.0, 0.0])
+            order = len(b)
+            # The section's input is the output so far: y = C x + D u
+            chained = np.zeros((order + 2, order + 2))
+            chained[:order, :order] = a
+            chained[order:, :order] = np.outer(sb, c)
+            chained[order:, order:] = sa
+            a = chained
+            b = np.concatenate([b, sb * d])
+            c = np.concatenate([b0 * c, sc])
+            d = b0 * d
+        return a, b, c, d
+
+    def process(self, samples):
+        """Filter an array of shape (samples, channels) and return the result"""
+        count = len(samples)
+        if count < self.length:
+            samples = np.concatenate([samples, np.zeros((self.length - count, samples.shape[1]))])
+        spectrum = np.fft.rfft(samples, self._fft_size, axis=0)
+        out = np.fft.irfft(spectrum * self._spectrum[:, None], self._fft_size, axis=0)[:self.length]
+        out += self._decay @ self._state
+        self._state = self._advance @ self._state + self._carry @ samples
+        return out[:count]
+
+
+class FilterChain:
+    """Per-guild DSP stage between the decoder and the Opus encoder.
+
+    ``configure`` may be called from any thread; the audio thread picks the
+    new settings up at its next frame. While no filter is set ``active`` is
+    False and callers skip the chain entirely.
+    """
+
+    def __init__(self, observe=None):
+        self.observe = observe  # Called with the processing time of each frame
+        self.active = False
+        self._pending = None
+        self._filter = None
+        self._speed = 1.0
+        self._buffer = np.zeros((0, 2))
+        self._position = 0.0
+
+    def configure(self, sections, speed=1.0):
+        """Switch to new filters; filter state starts over"""
+        self._pending = (BlockFilter(sections) if sections else None, speed)
+        self.active = True
+
+    def _resample(self, pull):
+        """Read one output frame at ``speed`` times the input rate (linear interpolation)"""
+        needed = self._position + FRAME_SAMPLES * self._speed + 1
+        while len(self._buffer) < needed:
+            frame = pull()
+            if not frame:
+                break
+            samples = np.frombuffer(frame, dtype='<i2').reshape(-1, 2)
+            self._buffer = np.concatenate([self._buffer, samples])
+
+        positions = self._position + self._speed * np.arange(FRAME_SAMPLES)
+        positions = positions[positions < len(self._buffer) - 1]
+        if not len(positions):
+            self._buffer = np.zeros((0, 2))
+            self._position = 0.0
+            return None
+
+        index = positions.astype(np.intp)
+        fraction = (positions - index)[:, None]
+        out = self._buffer[index] * (1 - fraction) + self._buffer[index + 1] * fraction
+
+        self._position += self._speed * len(positions)
+        consumed = int(self._position)
+        self._buffer = self._buffer[consumed:]
+        self._position -= consumed
+        if len(out) < FRAME_SAMPLES:
+            # The input ran out mid-frame - the encoder always reads a whole frame, so pad with silence
+            out = np.concatenate([out, np.zeros((FRAME_SAMPLES - len(out), 2))])
+        return out
+
+    def read(self, pull):
+        """Return the next processed frame, reading input frames with ``pull``"""
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            self._filter, self._speed = pending
+            self.active = self._filter is not None or self._speed != 1.0
+            if self._speed == 1.0:
+                self._buffer = np.zeros((0, 2))
+                self._position = 0.0
+            if not self.active:
+                return pull()
+
+        if self._speed == 1.0:
+            frame = pull()
+            if not frame:
+                return frame
+            started = time.perf_counter()
+            samples = np.frombuffer(frame, dtype='<i2').reshape(-1, 2).astype(np.float64)
+        else:
+            samples = self._resample(pull)
+            if samples is None:
+                return b''
+            started = time.perf_counter()
+
+        if self._filter is not None:
+            samples = self._filter.process(samples)
+        np.clip(samples, -FULL_SCALE, FULL_SCALE - 1, out=samples)
+        frame = samples.astype('<i2').tobytes()
+        if self.observe:
+            self.observe(time.perf_counter() - started)
+        return frame
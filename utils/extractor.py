@@ -0,0 +1,245 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Job priorities, most urgent first
+INTERACTIVE = 0  # Someone is waiting on the result (!play, the next song)
+BACKGROUND = 1   # Prefetching upcoming songs
+BULK = 2         # Playlist pages and downloads
+PRIORITY_NAMES = ('interactive', 'background', 'bulk')
+
+
+class ExtractorBusy(Exception):
+    """Raised when too many extractions are already waiting"""
+
+
+class _Job:
+    __slots__ = ('key', 'func', 'profile', 'priority', 'future', 'submitted', 'dequeued', 'waiters')
+
+    def __init__(self, key, func, profile, priority, future):
+        self.key = key
+        self.func = func
+        self.profile = profile
+        self.priority = priority
+        self.future = future
+        self.submitted = time.monotonic()
+        self.dequeued = False  # Started, or dropped because nobody waits for it any more
+        self.waiters = 0
+
+
+class ExtractorPool:
+    """Dedicated, bounded thread pool for yt-dlp extractions.
+
+    Each worker thread owns its own YoutubeDL instance per option profile,
+    and identical in-flight jobs (same key) are coalesced into a single
+    extraction.
+
+    Jobs wait in one queue per guild and priority. A free worker takes
+    the most urgent priority with work, and serves the guilds in that
+    priority round-robin. A guild never has more than ``guild_limit`` jobs
+    running, so one guild expanding huge playlists can't occupy every
+    worker while another waits for a single song.
+    """
+
+    def __init__(self, options, workers=4, max_pending=64, profiles=None, guild_limit=2,
+                 guild_max_pending=16, observe_wait=None, interactive_max_pending=None):
+        # Profile name -> YoutubeDL options; 'default' is the base options
+        self.profiles = {'default': options}
+        for name, overrides in (profiles or {}).items():
+            self.profiles[name] = {**options, **overrides}
+        self.workers = workers
+        self.max_pending = max_pending  # Cap on queued work, except interactive jobs
+        # Interactive jobs get a higher cap, so background work can't crowd out !play
+        self.interactive_max_pending = interactive_max_pending or 2 * max_pending
+        self.guild_limit = guild_limit  # Jobs a guild may have running at once
+        self.guild_max_pending = guild_max_pending  # Jobs a guild may have waiting
+        self.observe_wait = observe_wait  # Called with (priority name, seconds queued)
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ytdl')
+        self._local = threading.local()
+        self._jobs = {}  # Job key -> _Job, queued or running
+        self._queues = [{} for _ in PRIORITY_NAMES]  # Priority -> {guild ID: deque of jobs}
+        self._rotation = [deque() for _ in PRIORITY_NAMES]  # Priority -> guilds with queued jobs
+        self._running = {}  # Guild ID -> jobs running
+        self._waiting = {}  # Guild ID -> jobs queued
+        self.guild_waits = {}  # Guild ID -> [jobs started, total wait, max wait]
+
+        self.pending = 0  # Jobs submitted and not finished
+        self.active = 0   # Jobs currently running on a worker
+        self.stats = {
+            'submitted': 0,
+            'coalesced': 0,
+            'rejected': 0,
+            'wait_total': 0.0,
+            'wait_max': 0.0,
+        }
+
+    @property
+    def queue_depth(self):
+        """Jobs waiting for a free worker"""
+        return max(self.pending - self.active, 0)
+
+    @property
+    def average_wait(self):
+        """Mean time (seconds) jobs spent queued before a worker picked them up"""
+        started = self.stats['submitted']
+        return self.stats['wait_total'] / started if started else 0.0
+
+    def guild_wait(self, guild_id):
+        """(mean, max) seconds a guild's jobs waited for a worker"""
+        count, total, longest = self.guild_waits.get(guild_id, (0, 0.0, 0.0))
+        return (total / count if count else 0.0), longest
+
+    def forget(self, guild_id):
+        """Drop a departed guild's wait statistics"""
+        self.guild_waits.pop(guild_id, None)
+
+    def _ytdl(self, profile):
+        """Return the calling worker's YoutubeDL instance for a profile"""
+        instances = getattr(self._local, 'instances', None)
+        if instances is None:
+            instances = self._local.instances = {}
+        ytdl = instances.get(profile)
+        if ytdl is None:
+            import yt_dlp  # Deferred - importing it is a large share of start-up time
+            ytdl = instances[profile] = yt_dlp.YoutubeDL(self.profiles[profile])
+        return ytdl
+
+    async def warm(self, profile='default'):
+        """Import yt-dlp and build each worker's YoutubeDL before the first job needs one"""
+        loop = asyncio.get_running_loop()
+        # Submitted together, so the executor starts a thread for each
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self._ytdl, profile) for _ in range(self.workers)
+        ))
+
+    def _run(self, func, profile):
+        """Execute a job on a worker thread"""
+        return func(self._ytdl(profile))
+
+    def _enqueue(self, job, guild_id):
+        queues = self._queues[job.priority]
+        jobs = queues.get(guild_id)
+        if jobs is None:
+            jobs = queues[guild_id] = deque()
+            self._rotation[job.priority].append(guild_id)
+        jobs.append(job)
+        self._waiting[guild_id] = self._waiting.get(guild_id, 0) + 1
+
+    def _next_job(self):
+        """Pick the next job to run, or (None, None) if every queued guild is at its limit"""
+        for priority, rotation in enumerate(self._rotation):
+            queues = self._queues[priority]
+            for _ in range(len(rotation)):
+                guild_id = rotation[0]
+                rotation.rotate(-1)  # The guild goes to the back of the line
+                if self._running.get(guild_id, 0) >= self.guild_limit:
+                    continue
+                jobs = queues[guild_id]
+                job = None
+                while jobs and job is None:
+                    job = jobs.popleft()
+                    self._waiting[guild_id] -= 1
+                    if job.dequeued:
+                        job = None  # Dropped, or already run from a more urgent queue
+                if not self._waiting[guild_id]:
+                    del self._waiting[guild_id]
+                if not jobs:
+                    del queues[guild_id]
+                    rotation.pop()
+                if job is not None:
+                    return job, guild_id
+        return None, None
+
+    def _dispatch(self):
+        """Hand queued jobs to free workers"""
+        loop = asyncio.get_running_loop()
+        while self.active < self.workers:
+            job, guild_id = self._next_job()
+            if job is None:
+                return
+            job.dequeued = True
+            self.active += 1
+            self._running[guild_id] = self._running.get(guild_id, 0) + 1
+
+            waited = time.monotonic() - job.submitted
+            self.stats['wait_total'] += waited
+            self.stats['wait_max'] = max(self.stats['wait_max'], waited)
+            waits = self.guild_waits.get(guild_id)
+            if waits is None:
+                waits = self.guild_waits[guild_id] = [0, 0.0, 0.0]
+            waits[0] += 1
+            waits[1] += waited
+            waits[2] = max(waits[2], waited)
+            if self.observe_wait:
+                self.observe_wait(PRIORITY_NAMES[job.priority], waited)
+
+            running = loop.run_in_executor(self._executor, self._run, job.func, job.profile)
+            running.add_done_callback(lambda f, job=job, guild_id=guild_id: self._finished(job, guild_id, f))
+
+    def _finished(self, job, guild_id, running):
+        self.pending -= 1
+        self.active -= 1
+        self._running[guild_id] -= 1
+        if not self._running[guild_id]:
+            del self._running[guild_id]
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+
+        if not job.future.done():
+            if running.cancelled():
+                job.future.cancel()
+            elif running.exception() is not None:
+                job.future.set_exception(running.exception())
+            else:
+                job.future.set_result(running.result())
+        self._dispatch()
+
+    async def _wait(self, job):
+        job.waiters += 1
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            job.waiters -= 1
+            if not job.waiters and not job.dequeued:
+                # Every caller gave up (e.g. a cancelled playlist expansion) - don't run it
+                job.dequeued = True
+                self.pending -= 1
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+                job.future.cancel()
+            raise
+
+    async def run(self, key, func, profile='default', guild_id=None, priority=INTERACTIVE):
+        """Run ``func(ytdl)`` on the pool, sharing the result with identical jobs"""
+        job = self._jobs.get(key)
+        if job is not None:
+            self.stats['coalesced'] += 1
+            if not job.dequeued and priority < job.priority:
+                # Someone now waits on a queued background job - queue it again, more urgently
+                job.priority = priority
+                self._enqueue(job, guild_id)
+                self._dispatch()
+            return await self._wait(job)
+
+        limit = self.interactive_max_pending if priority == INTERACTIVE else self.max_pending
+        if self._waiting.get(guild_id, 0) >= self.guild_max_pending or self.pending >= limit:
+            self.stats['rejected'] += 1
+            raise ExtractorBusy(f"{self.pending} extractions already pending")
+
+        job = _Job(key, func, profile, priority, asyncio.get_running_loop().create_future())
+        self.pending += 1
+        self.stats['submitted'] += 1
+        self._jobs[key] = job
+        self._enqueue(job, guild_id)
+        self._dispatch()
+        return await self._wait(job)
+
+    def shutdown(self):
+        """Stop accepting work and release the worker threads"""
+        for job in self._jobs.values():
+            if not job.dequeued:
+                job.future.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
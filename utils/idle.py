@@ -0,0 +1,85 @@
+import asyncio
+import heapq
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class IdleReaper:
+    """One heap-based timer for every guild's idle disconnect.
+
+    ``touch`` (re)starts a guild's countdown and ``cancel`` stops it, both
+    without creating tasks; outdated heap entries are skipped lazily. Guilds
+    whose countdown ran out are handed to ``on_idle`` in batches.
+    """
+
+    def __init__(self, on_idle, timeout=300, batch_size=50):
+        self.on_idle = on_idle  # async callable(list of guild IDs)
+        self.timeout = timeout
+        self.batch_size = batch_size
+
+        self._deadlines = {}  # Guild ID -> monotonic deadline
+        self._heap = []       # (deadline, guild ID), may hold outdated entries
+        self._task = None
+        self.stats = {'reaped': 0, 'batches': 0}
+
+    def start(self):
+        """Start the reaper loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """Stop the reaper loop"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def touch(self, guild_id):
+        """Start or restart a guild's idle countdown"""
+        deadline = time.monotonic() + self.timeout
+        self._deadlines[guild_id] = deadline
+        heapq.heappush(self._heap, (deadline, guild_id))
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            # Drop outdated entries so the heap doesn't grow with every touch
+            self._heap = [(d, g) for g, d in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, guild_id):
+        """Stop a guild's idle countdown"""
+        self._deadlines.pop(guild_id, None)
+
+    def pending(self):
+        """Number of guilds with a running countdown"""
+        return len(self._deadlines)
+
+    def _expired(self, now):
+        expired = []
+        while self._heap and len(expired) < self.batch_size:
+            deadline, guild_id = self._heap[0]
+            if self._deadlines.get(guild_id) != deadline:
+                heapq.heappop(self._heap)  # Cancelled or touched again since
+                continue
+            if deadline > now:
+                break
+            heapq.heappop(self._heap)
+            del self._deadlines[guild_id]
+            expired.append(guild_id)
+        return expired
+
+    async def _run(self):
+        while True:
+            expired = self._expired(time.monotonic())
+            if expired:
+                self.stats['batches'] += 1
+                self.stats['reaped'] += len(expired)
+                try:
+                    await self.on_idle(expired)
+                except Exception as e:
+                    logger.error(f"Idle disconnect failed: {e}")
+                continue
+
+            # Every countdown has the same length, so a new one never ends
+            # before the earliest deadline already in the heap
+            delay = self._heap[0][0] - time.monotonic() if self._heap else self.timeout
+            await asyncio.sleep(max(delay, 0.05))
@@ -0,0 +1,143 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_handler = None  # Queue handler installed by setup_logging
+
+# Attributes every LogRecord has; anything else came from ``extra=``
+_STANDARD = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any ``extra=`` fields (guild_id, latency_ms, ...) kept"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets each call site log at most ``burst`` warnings or errors per ``period`` seconds.
+
+    Call sites are told apart by file and line, since messages are
+    f-strings. Records over the limit are dropped and counted; the next
+    record let through says how many were suppressed.
+    """
+
+    def __init__(self, burst=5, period=60.0, level=logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self.level = level
+        self._sites = {}  # (path, line) -> [window start, records in window, suppressed]
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record):
+        if record.levelno < self.level or self.burst <= 0:
+            return True
+        now = time.monotonic()
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self.period:
+                dropped = site[2] if site else 0
+                site = self._sites[key] = [now, 0, 0]
+            else:
+                dropped = site[2]
+            if site[1] >= self.burst:
+                site[2] += 1
+                self.suppressed += 1
+                return False
+            site[1] += 1
+            site[2] = 0
+        if dropped:
+            record.msg = f"{record.msg} ({dropped} similar messages suppressed)"
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, record_queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(path='bot.log', level='INFO', json_format=False, max_bytes=10 * 1024 * 1024,
+                  backups=5, rotate_when=None, rate_limit=5, queue_size=10000):
+    """Route the root logger through a queue to a background listener thread.
+
+    Log calls only put the record on a bounded queue; formatting, console
+    output and file writes happen on the listener thread, so a slow disk
+    can't stall the event loop. The file rotates at ``max_bytes``, or on
+    the ``rotate_when`` schedule (e.g. 'midnight') if one is given.
+    Returns the queue handler, whose ``dropped`` counts records lost to a
+    full queue.
+    """
+    global _handler
+    if rotate_when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            path, when=rotate_when, backupCount=backups, encoding='utf-8'
+        )
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8'
+        )
+    console = logging.StreamHandler(sys.stderr)
+    file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+    console.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    handler = DroppingQueueHandler(queue.Queue(queue_size))
+    handler.limiter = RateLimitFilter(burst=rate_limit)
+    handler.addFilter(handler.limiter)
+    listener = logging.handlers.QueueListener(
+        handler.queue, file_handler, console, respect_handler_level=True
+    )
+
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level)
+    _handler = handler
+
+    listener.start()
+    atexit.register(listener.stop)  # Flushes whatever is still queued
+    return handler
+
+
+def stats():
+    """Records lost to a full queue or suppressed by rate limiting"""
+    if _handler is None:
+        return {}
+    return {
+        'dropped': _handler.dropped,
+        'suppressed': _handler.limiter.suppressed,
+        'queued': _handler.queue.qsize(),
+    }
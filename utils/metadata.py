@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import re
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+SPOTIFY_API = 'https://api.spotify.com/v1'
+SPOTIFY_TOKEN_URL = 'https://accounts.spotify.com/api/token'
+DEEZER_API = 'https://api.deezer.com'
+
+_SPOTIFY_URL = re.compile(
+    r'^(?:https?://open\.spotify\.com/(?:intl-[\w-]+/)?|spotify:)(track|album|playlist)[/:]([A-Za-z0-9]+)'
+)
+_DEEZER_URL = re.compile(r'^https?://(?:www\.)?deezer\.com/(?:[a-z]{2}/)?(track|album|playlist)/(\d+)')
+
+
+def parse_link(url):
+    """Return (service, kind, ID) for a Spotify or Deezer link, or None"""
+    for service, pattern in (('spotify', _SPOTIFY_URL), ('deezer', _DEEZER_URL)):
+        match = pattern.match(url.strip())
+        if match:
+            return service, match.group(1), match.group(2)
+    return None
+
+
+class MetadataTrack:
+    """A track known only by its title, artists and length"""
+
+    __slots__ = ('source', 'title', 'artists', 'duration')
+
+    def __init__(self, source, title, artists, duration):
+        self.source = source  # e.g. 'spotify:<track ID>', the key of its cached match
+        self.title = title
+        self.artists = artists
+        self.duration = duration
+
+
+def spotify_track(item):
+    """Parse a Spotify track object, or None for local files, episodes and removed tracks"""
+    if not item or item.get('type', 'track') != 'track' or item.get('is_local') or not item.get('id'):
+        return None
+    return MetadataTrack(
+        f"spotify:{item['id']}",
+        item.get('name') or 'Unknown',
+        ', '.join(artist['name'] for artist in item.get('artists', ()) if artist.get('name')),
+        int(item.get('duration_ms') or 0) // 1000
+    )
+
+
+def spotify_page(payload):
+    """Parse a page of album or playlist tracks into (tracks, next page URL)"""
+    tracks = []
+    for item in payload.get('items', ()):
+        # Playlist items wrap the track, album items are the track
+        track = spotify_track(item.get('track') if 'track' in item else item)
+        if track:
+            tracks.append(track)
+    return tracks, payload.get('next')
+
+
+def deezer_track(item):
+    """Parse a Deezer track object"""
+    if not item or not item.get('id') or item.get('readable') is False:
+        return None
+    return MetadataTrack(
+        f"deezer:{item['id']}",
+        item.get('title') or 'Unknown',
+        (item.get('artist') or {}).get('name', ''),
+        int(item.get('duration') or 0)
+    )
+
+
+def deezer_page(payload):
+    """Parse a page of album or playlist tracks into (tracks, next page URL)"""
+    tracks = [track for track in map(deezer_track, payload.get('data', ())) if track]
+    return tracks, payload.get('next')
+
+
+class MetadataClient:
+    """Reads track lists from the Spotify and Deezer web APIs.
+
+    Requests to each service are spaced at least ``interval`` seconds
+    apart, and a 429 response is retried after the delay the service asks
+    for. Spotify needs client credentials; Deezer's API is public.
+    """
+
+    def __init__(self, spotify_id=None, spotify_secret=None, interval=0.1, timeout=10):
+        self.spotify_id = spotify_id
+        self.spotify_secret = spotify_secret
+        self.interval = interval
+        self.timeout = timeout
+        self._session = None
+        self._token = None
+        self._token_expires = 0.0
+        self._next_slot = {}  # Service -> monotonic time its next request may start
+        self.stats = {'requests': 0, 'rate_limited': 0}
+
+    def supports(self, service):
+        return service != 'spotify' or bool(self.spotify_id and self.spotify_secret)
+
+    async def _throttle(self, service):
+        now = time.monotonic()
+        slot = max(self._next_slot.get(service, now), now)
+        self._next_slot[service] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _spotify_token(self):
+        if self._token and time.monotonic() < self._token_expires:
+            return self._token
+        auth = aiohttp.BasicAuth(self.spotify_id, self.spotify_secret)
+        async with self._session.post(SPOTIFY_TOKEN_URL, data={'grant_type': 'client_credentials'},
+                                      auth=auth) as response:
+            response.raise_for_status()
+            payload = await response.json()
+        self._token = payload['access_token']
+        self._token_expires = time.monotonic() + payload.get('expires_in', 3600) - 60
+        return self._token
+
+    async def _get(self, service, url, params=None):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        for attempt in range(3):
+            await self._throttle(service)
+            headers = {}
+            if service == 'spotify':
+                headers['Authorization'] = f"Bearer {await self._spotify_token()}"
+            self.stats['requests'] += 1
+            async with self._session.get(url, params=params, headers=headers) as response:
+                if response.status == 429:
+                    self.stats['rate_limited'] += 1
+                    await asyncio.sleep(min(float(response.headers.get('Retry-After', '1')), 30))
+                    continue
+                if response.status == 401 and service == 'spotify':
+                    self._token = None
+                    continue
+                response.raise_for_status()
+                payload = await response.json()
+            error = payload.get('error') if isinstance(payload, dict) else None
+            if service == 'deezer' and error:
+                if error.get('code') == 4:  # Quota exceeded
+                    self.stats['rate_limited'] += 1
+                    await asyncio.sleep(5)
+                    continue
+                raise ValueError(error.get('message', 'Deezer request failed'))
+            return payload
+        raise ValueError(f"{service.title()} is rate limiting requests, try again later")
+
+    async def fetch(self, service, kind, item_id):
+        """Return (tracks, next page URL or None) for a track, album or playlist"""
+        if not self.supports(service):
+            raise ValueError("Spotify links need SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET to be set")
+        if service == 'spotify':
+            if kind == 'track':
+                track = spotify_track(await self._get(service, f"{SPOTIFY_API}/tracks/{item_id}"))
+                return [track] if track else [], None
+            limit = 100 if kind == 'playlist' else 50
+            payload = await self._get(service, f"{SPOTIFY_API}/{kind}s/{item_id}/tracks", {'limit': limit})
+            return spotify_page(payload)
+
+        if kind == 'track':
+            track = deezer_track(await self._get(service, f"{DEEZER_API}/track/{item_id}"))
+            return [track] if track else [], None
+        payload = await self._get(service, f"{DEEZER_API}/{kind}/{item_id}/tracks", {'limit': 100})
+        return deezer_page(payload)
+
+    async def next_page(self, service, url):
+        """Return (tracks, next page URL or None) for a page URL from an earlier call"""
+        payload = await self._get(service, url)
+        return spotify_page(payload) if service == 'spotify' else deezer_page(payload)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
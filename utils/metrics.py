@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Seconds - covers cache hits (sub-millisecond) up to slow extractions
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+class _Metric:
+    """Base for metrics with optional labels; children are created on first use"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children = {}
+        if not self.label_names:
+            self._default = self._children[()] = self._new_child()
+
+    def labels(self, *values):
+        """Return the child metric for a set of label values"""
+        values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._children.items():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default.value += amount
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.label_names, values)} {child.value}"]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or is read from a callback at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help, labels=(), callback=None):
+        self.callback = callback
+        super().__init__(name, help, labels)
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value):
+        self._default.value = value
+
+    def get(self):
+        return self.callback() if self.callback else self._default.value
+
+    def _render_child(self, values, child):
+        value = self.callback() if self.callback and not values else child.value
+        return [f"{self.name}{_format_labels(self.label_names, values)} {value}"]
+
+
+class _Buckets:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket it falls in"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labels)
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def quantile(self, q):
+        """Quantile estimate across every label set"""
+        merged = _Buckets(self.buckets)
+        for child in self._children.values():
+            merged.counts = [a + b for a, b in zip(merged.counts, child.counts)]
+            merged.count += child.count
+        return merged.quantile(q)
+
+    def _render_child(self, values, child):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, child.counts):
+            cumulative += count
+            labels = _format_labels(self.label_names, values, ('le', bound))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.label_names, values, ('le', '+Inf'))
+        lines.append(f"{self.name}_bucket{labels} {child.count}")
+        labels = _format_labels(self.label_names, values)
+        lines.append(f"{self.name}_sum{labels} {child.sum}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    """Set of metrics rendered together in Prometheus text format"""
+
+    def __init__(self, prefix='echox'):
+        self.prefix = prefix
+        self._metrics = []
+        self._collectors = []  # (name, callable returning a dict of numbers)
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(f"{self.prefix}_{name}", help, labels))
+
+    def gauge(self, name, help, labels=(), callback=None):
+        return self._add(Gauge(f"{self.prefix}_{name}", help, labels, callback))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(f"{self.prefix}_{name}", help, labels, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, name, collect):
+        """Export every numeric value of a stats dict as a gauge at scrape time"""
+        self._collectors.append((f"{self.prefix}_{name}", collect))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, collect in self._collectors:
+            try:
+                stats = collect()
+            except Exception as e:
+                logger.warning(f"Metrics collector {name} failed: {e}")
+                continue
+            for key, value in stats.items():
+                if isinstance(value, (int, float)):
+                    lines.append(f"# TYPE {name}_{key} gauge")
+                    lines.append(f"{name}_{key} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+async def start_server(registry, host='127.0.0.1', port=9108):
+    """Serve ``/metrics`` over HTTP; returns the runner to clean up later"""
+    async def handle(request):
+        return web.Response(text=registry.render(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+async def monitor_loop_lag(histogram, gauge, interval=0.5):
+    """Measure how late the event loop wakes up from a fixed sleep"""
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lag = max(time.perf_counter() - expected, 0.0)
+        histogram.observe(lag)
+        gauge.set(lag)
@@ -1,13 +1,104 @@
-from collections import deque
+from bisect import bisect_right
+from itertools import chain, islice
 import random
+import sys
+import time
 
 class Song:
-    def __init__(self, title, url, duration=0, thumbnail=None, uploader="Unknown"):
+    __slots__ = ('title', 'url', 'duration', 'thumbnail', 'uploader',
+                 'video_id', 'webpage_url', 'expires', 'codec', 'source')
+
+    def __init__(self, title, url, duration=0, thumbnail=None, uploader="Unknown",
+                 video_id=None, webpage_url=None, expires=None, codec=None, source=None):
         self.title = title
-        self.url = url
+        self.url = url  # Signed stream URL, may expire
         self.duration = duration  # Duration in seconds
         self.thumbnail = thumbnail
-        self.uploader = uploader
+        self.uploader = sys.intern(uploader)  # Shared between songs of the same uploader
+        self.video_id = video_id
+        self.webpage_url = webpage_url  # Stable page URL used to refresh the stream URL
+        self.expires = expires  # Unix time the stream URL stops working, None if unknown
+        self.codec = codec  # Audio codec of the stream, e.g. 'opus'
+        self.source = source  # e.g. 'spotify:<id>' for tracks found by title and artist
+
+    @classmethod
+    def from_info(cls, info):
+        """Build a Song from a yt-dlp info dict or cached entry"""
+        return cls(
+            title=info.get('title') or 'Unknown',
+            url=info.get('url'),
+            duration=int(info.get('duration') or 0),
+            thumbnail=info.get('thumbnail'),
+            uploader=info.get('uploader') or 'Unknown',
+            video_id=info.get('id'),
+            webpage_url=info.get('webpage_url'),
+            expires=info.get('url_expires'),
+            codec=info.get('acodec')
+        )
+
+    @classmethod
+    def from_flat(cls, entry):
+        """Build an unresolved placeholder from a flat playlist entry"""
+        return cls(
+            title=entry.get('title') or 'Unknown',
+            url=None,
+            duration=int(entry.get('duration') or 0),
+            uploader=entry.get('uploader') or entry.get('channel') or 'Unknown',
+            video_id=entry.get('id'),
+            webpage_url=entry.get('url') or entry.get('webpage_url')
+        )
+
+    @classmethod
+    def from_metadata(cls, track):
+        """Build a placeholder for a track known only by title and artist"""
+        return cls(
+            title=track.title,
+            url=None,
+            duration=track.duration,
+            uploader=track.artists or 'Unknown',
+            source=track.source
+        )
+
+    @property
+    def search_query(self):
+        """Text that finds a playable version of a metadata-only track"""
+        return f"{self.uploader} - {self.title}"
+
+    def to_record(self):
+        """Compact, JSON-friendly form used for snapshots (no stream URL)"""
+        record = [self.title, self.duration, self.uploader, self.video_id,
+                  self.webpage_url, self.thumbnail]
+        if self.source:
+            record.append(self.source)
+        return record
+
+    @classmethod
+    def from_record(cls, record):
+        """Rebuild an unresolved song from ``to_record`` output"""
+        title, duration, uploader, video_id, webpage_url, thumbnail, *rest = record
+        return cls(title=title, url=None, duration=duration, thumbnail=thumbnail,
+                   uploader=uploader, video_id=video_id, webpage_url=webpage_url,
+                   source=rest[0] if rest else None)
+
+    def update(self, info):
+        """Refresh this song in place from a newly resolved info dict"""
+        self.url = info.get('url')
+        self.expires = info.get('url_expires')
+        self.codec = info.get('acodec')
+        if not self.source:  # Metadata-only tracks keep their own title and artist
+            self.title = info.get('title') or self.title
+            self.uploader = sys.intern(info.get('uploader') or self.uploader)
+        # A known duration is kept so queue totals stay consistent
+        self.duration = self.duration or int(info.get('duration') or 0)
+        self.thumbnail = info.get('thumbnail') or self.thumbnail
+        self.video_id = info.get('id') or self.video_id
+        self.webpage_url = info.get('webpage_url') or self.webpage_url
+
+    def is_fresh(self, margin=0):
+        """Check the stream URL is usable for at least ``margin`` more seconds"""
+        if not self.url:
+            return False
+        return self.expires is None or self.expires - margin > time.time()
 
     def format_duration(self):
         """Format duration from seconds to MM:SS"""
@@ -18,35 +109,198 @@ class Song:
         seconds = self.duration % 60
         return f"{minutes:02d}:{seconds:02d}"
 
+def format_time(seconds):
+    """Format a position in seconds as MM:SS, or H:MM:SS from an hour up"""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+def parse_time(text):
+    """Parse '90', '1:30' or '1:02:03' into seconds"""
+    seconds = 0
+    for part in text.split(':'):
+        if not part.isdigit():
+            raise ValueError(f"Invalid time: {text}")
+        seconds = seconds * 60 + int(part)
+    return seconds
+
 class MusicQueue:
+    """Song queue stored in fixed-size blocks.
+
+    Blocks keep indexed access, removal, moves and jumps cheap for very long
+    queues, and running duration totals are maintained per block so they
+    never need to be recomputed from scratch.
+    """
+
+    BLOCK_SIZE = 512
+
     def __init__(self):
-        self.songs = deque()
+        self._blocks = []     # Lists of songs, each at most 2 * BLOCK_SIZE long
+        self._durations = []  # Total duration of each block
+        self._offsets = None  # Queue index of each block's first song, rebuilt lazily
+        self._length = 0
+        self.total_duration = 0  # Seconds of queued audio
+        self.version = 0  # Bumped on every change to the queued songs
         self.current = None
 
+    def _changed(self):
+        self.version += 1
+
+    def _index_blocks(self):
+        if self._offsets is None:
+            offsets, total = [], 0
+            for block in self._blocks:
+                offsets.append(total)
+                total += len(block)
+            self._offsets = offsets
+        return self._offsets
+
+    def _locate(self, index):
+        """Return (block number, position in block) for a queue index"""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("queue index out of range")
+        offsets = self._index_blocks()
+        block = bisect_right(offsets, index) - 1
+        return block, index - offsets[block]
+
+    def _pop(self, block, position):
+        song = self._blocks[block].pop(position)
+        self._durations[block] -= song.duration
+        if not self._blocks[block]:
+            del self._blocks[block]
+            del self._durations[block]
+        self._offsets = None
+        self._length -= 1
+        self.total_duration -= song.duration
+        self._changed()
+        return song
+
     def add(self, song):
         """Add a song to the queue"""
-        self.songs.append(song)
+        if not self._blocks or len(self._blocks[-1]) >= self.BLOCK_SIZE:
+            if self._offsets is not None:
+                self._offsets.append(self._length)
+            self._blocks.append([])
+            self._durations.append(0)
+        self._blocks[-1].append(song)
+        self._durations[-1] += song.duration
+        self._length += 1
+        self.total_duration += song.duration
+        self._changed()
+
+    def insert(self, index, song):
+        """Insert a song before the given queue index"""
+        if index >= self._length:
+            self.add(song)
+            return
+        block, position = self._locate(max(index, 0))
+        songs = self._blocks[block]
+        songs.insert(position, song)
+        self._durations[block] += song.duration
+        if len(songs) > 2 * self.BLOCK_SIZE:
+            # Split oversized blocks to keep inserts and removals cheap
+            half = songs[self.BLOCK_SIZE:]
+            del songs[self.BLOCK_SIZE:]
+            moved = sum(s.duration for s in half)
+            self._blocks.insert(block + 1, half)
+            self._durations[block] -= moved
+            self._durations.insert(block + 1, moved)
+        self._offsets = None
+        self._length += 1
+        self.total_duration += song.duration
+        self._changed()
 
     def get_next(self):
         """Get the next song from the queue"""
-        if self.songs:
-            return self.songs.popleft()
+        if self._length:
+            return self._pop(0, 0)
         return None
 
+    def remove_at(self, index):
+        """Remove and return the song at a queue index"""
+        return self._pop(*self._locate(index))
+
+    def remove(self, song):
+        """Remove a specific song from the queue if it is still there"""
+        for block, songs in enumerate(self._blocks):
+            for position, queued in enumerate(songs):
+                if queued is song:
+                    self._pop(block, position)
+                    return True
+        return False
+
+    def move(self, source, destination):
+        """Move the song at one queue index to another"""
+        song = self.remove_at(source)
+        self.insert(destination, song)
+        return song
+
+    def jump(self, index):
+        """Drop every song before a queue index; returns how many were dropped"""
+        block, position = self._locate(index)
+        del self._blocks[:block]
+        del self._durations[:block]
+        if position:
+            dropped = self._blocks[0][:position]
+            del self._blocks[0][:position]
+            self._durations[0] -= sum(s.duration for s in dropped)
+        self._offsets = None
+        self._length -= index
+        self.total_duration = sum(self._durations)
+        self._changed()
+        return index
+
+    def peek(self, count):
+        """Return the next ``count`` songs without removing them"""
+        return list(islice(self, count))
+
+    def slice(self, start, stop):
+        """Return the songs between two queue indexes without copying the queue"""
+        if start >= self._length or stop <= start:
+            return []
+        block, position = self._locate(max(start, 0))
+        songs = chain(self._blocks[block][position:], *self._blocks[block + 1:])
+        return list(islice(songs, stop - max(start, 0)))
+
     def is_empty(self):
         """Check if the queue is empty"""
-        return len(self.songs) == 0
+        return self._length == 0
 
     def clear(self):
         """Clear the entire queue"""
-        self.songs.clear()
+        self._blocks = []
+        self._durations = []
+        self._offsets = None
+        self._length = 0
+        self.total_duration = 0
         self.current = None
+        self._changed()
 
     def shuffle(self):
-        """Shuffle the queue"""
-        songs_list = list(self.songs)
-        random.shuffle(songs_list)
-        self.songs = deque(songs_list)
+        """Shuffle the queue in place (Fisher-Yates across blocks)"""
+        offsets = self._index_blocks()
+        blocks = self._blocks
+        uniform = random.random
+        for block in range(len(blocks) - 1, -1, -1):
+            songs = blocks[block]
+            start = offsets[block]
+            for position in range(len(songs) - 1, -1, -1):
+                j = int(uniform() * (start + position + 1))
+                other = bisect_right(offsets, j) - 1
+                swap = j - offsets[other]
+                songs[position], blocks[other][swap] = blocks[other][swap], songs[position]
+        self._durations = [sum(s.duration for s in songs) for songs in blocks]
+        self._changed()
+
+    def __getitem__(self, index):
+        block, position = self._locate(index)
+        return self._blocks[block][position]
+
+    def __iter__(self):
+        return chain.from_iterable(self._blocks)
 
     def __len__(self):
-        return len(self.songs)
\ No newline at end of file
+        return self._length
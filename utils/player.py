@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class GuildPlayer:
+    """Serializes every playback state change of one guild through a mailbox.
+
+    Commands are handled one at a time by a single task, so handlers never
+    interleave. A command listed in ``coalesced`` that is already waiting in
+    the mailbox is not queued again; the waiting one just takes the newest
+    arguments.
+    """
+
+    def __init__(self, guild_id, handlers, coalesced=(), loop=None):
+        self.guild_id = guild_id
+        self.handlers = handlers  # Command -> async callable(guild_id, *args)
+        self.coalesced = frozenset(coalesced)
+        self.loop = loop or asyncio.get_running_loop()
+
+        self._mailbox = deque()  # [command, args] entries
+        self._waiting = {}       # Coalesced command -> its mailbox entry
+        self._wakeup = asyncio.Event()
+        self._task = self.loop.create_task(self._run())
+        self.stats = {'handled': 0, 'coalesced': 0, 'failed': 0}
+
+    def send(self, command, *args):
+        """Queue a command for this guild (event loop thread only)"""
+        entry = self._waiting.get(command)
+        if entry is not None:
+            entry[1] = args
+            self.stats['coalesced'] += 1
+            return
+
+        entry = [command, args]
+        if command in self.coalesced:
+            self._waiting[command] = entry
+        self._mailbox.append(entry)
+        self._wakeup.set()
+
+    def send_threadsafe(self, command, *args):
+        """Queue a command from another thread, such as the audio thread"""
+        self.loop.call_soon_threadsafe(self.send, command, *args)
+
+    def pending(self):
+        """Number of commands waiting to be handled"""
+        return len(self._mailbox)
+
+    async def _run(self):
+        while True:
+            if not self._mailbox:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            entry = self._mailbox.popleft()
+            command, args = entry
+            if self._waiting.get(command) is entry:
+                del self._waiting[command]
+
+            try:
+                await self.handlers[command](self.guild_id, *args)
+                self.stats['handled'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error(f"Player command {command} failed in guild {self.guild_id}: {e}")
+
+    def close(self):
+        """Stop handling commands"""
+        self._task.cancel()
+        self._mailbox.clear()
+        self._waiting.clear()
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """Keeps the head of every guild queue resolved with fresh stream URLs.
+
+    Queues are checked whenever they change (``poke``) and swept periodically
+    so songs that sat in the queue are re-resolved before their URL expires.
+    """
+
+    def __init__(self, queues, resolve, depth=3, margin=600, interval=60, warm=False):
+        self.queues = queues    # Guild ID -> MusicQueue, shared with the cog
+        self.resolve = resolve  # async callable(song, margin, guild_id) refreshing a song in place
+        self.depth = depth
+        self.margin = margin
+        self.interval = interval
+        self.warm = warm
+
+        self._dirty = set()
+        self._inflight = set()  # Songs currently being resolved
+        self._tasks = set()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._session = None
+
+        self.stats = {'resolved': 0, 'failed': 0, 'warmed': 0}
+
+    def start(self):
+        """Start the background prefetch loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop prefetching and release the HTTP session"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for task in self._tasks:
+            task.cancel()
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    def poke(self, guild_id):
+        """Schedule a check of one guild's queue"""
+        self._dirty.add(guild_id)
+        self._wakeup.set()
+
+    async def _run(self):
+        last_sweep = time.monotonic()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if time.monotonic() - last_sweep >= self.interval:
+                guild_ids = list(self.queues)
+                last_sweep = time.monotonic()
+            else:
+                guild_ids = self._dirty
+            self._dirty = set()
+
+            for guild_id in guild_ids:
+                queue = self.queues.get(guild_id)
+                if queue is not None:
+                    self._prefetch(guild_id, queue)
+
+    def _prefetch(self, guild_id, queue):
+        for song in queue.peek(self.depth):
+            if song in self._inflight or song.is_fresh(self.margin):
+                continue
+            self._inflight.add(song)
+            task = asyncio.create_task(self._fetch(guild_id, song))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, guild_id, song):
+        try:
+            await self.resolve(song, self.margin, guild_id)
+            self.stats['resolved'] += 1
+            if self.warm:
+                await self._warm_up(song)
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.warning(f"Prefetch failed for {song.title}: {e}")
+        finally:
+            self._inflight.discard(song)
+
+    async def _warm_up(self, song):
+        """Open the stream URL once so DNS/TLS and the CDN edge are warm"""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        async with self._session.get(song.url, headers={'Range': 'bytes=0-0'}) as response:
+            if response.status in (403, 404, 410):
+                # Rejected even though it looked fresh - force a re-resolve next sweep
+                song.expires = 0
+            else:
+                self.stats['warmed'] += 1
@@ -0,0 +1,106 @@
+import discord
+
+from utils.music_utils import format_time
+
+PAGE_SIZE = 10
+TITLE_LIMIT = 70  # Keeps a full page inside Discord's 1024 character field limit
+
+
+class QueuePages:
+    """Renders a guild's queue one page at a time.
+
+    Only the songs on the requested page are read from the queue. Rendered
+    pages are kept until the queue's version changes, and the durations in
+    the footer come from the queue's running totals.
+    """
+
+    def __init__(self, queue, page_size=PAGE_SIZE):
+        self.queue = queue
+        self.page_size = page_size
+        self._version = None
+        self._pages = {}  # Page number -> rendered song list
+
+    @property
+    def page_count(self):
+        return max(1, -(-len(self.queue) // self.page_size))
+
+    def _lines(self, page):
+        queue = self.queue
+        if self._version != queue.version:
+            self._pages.clear()
+            self._version = queue.version
+
+        lines = self._pages.get(page)
+        if lines is None:
+            start = page * self.page_size
+            rows = []
+            for number, song in enumerate(queue.slice(start, start + self.page_size), start + 1):
+                title = song.title if len(song.title) <= TITLE_LIMIT else song.title[:TITLE_LIMIT - 1] + '…'
+                rows.append(f"`{number}.` **{title}** - {song.format_duration()}")
+            lines = self._pages[page] = "\n".join(rows)
+        return lines
+
+    def render(self, page, position=0):
+        """Build the embed for a page; ``position`` is how far into the current song playback is"""
+        page = max(0, min(page, self.page_count - 1))
+        queue = self.queue
+        embed = discord.Embed(title="📝 Music Queue", color=discord.Color.blue())
+
+        current = queue.current
+        if current:
+            embed.add_field(
+                name="🎵 Now Playing",
+                value=f"**{current.title}**\nBy: {current.uploader}",
+                inline=False
+            )
+        if len(queue):
+            embed.add_field(name="⏭️ Up Next", value=self._lines(page), inline=False)
+
+        remaining = queue.total_duration + (max(current.duration - position, 0) if current else 0)
+        embed.set_footer(
+            text=f"Page {page + 1}/{self.page_count} | {len(queue)} songs | "
+                 f"{format_time(queue.total_duration)} queued | {format_time(remaining)} left"
+        )
+        return embed
+
+
+class QueueView(discord.ui.View):
+    """Previous/next buttons that page through a queue"""
+
+    def __init__(self, pages, position, page=0, timeout=120):
+        super().__init__(timeout=timeout)
+        self.pages = pages
+        self.position = position  # Callable returning the current playback position
+        self.page = page
+        self.message = None
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous.disabled = self.page <= 0
+        self.next.disabled = self.page >= self.pages.page_count - 1
+
+    async def _show(self, interaction):
+        self.page = max(0, min(self.page, self.pages.page_count - 1))
+        self._update_buttons()
+        await interaction.response.edit_message(
+            embed=self.pages.render(self.page, self.position()), view=self
+        )
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction, button):
+        self.page -= 1
+        await self._show(interaction)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction, button):
+        self.page += 1
+        await self._show(interaction)
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
@@ -0,0 +1,143 @@
+import logging
+import threading
+import time
+from collections import deque
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+SILENCE = b'\xf8\xff\xfe'  # One Opus frame of silence
+FRAME_DELAY = 0.02
+
+
+class Listener(discord.AudioSource):
+    """A voice client's end of a station: a small ring buffer of Opus frames.
+
+    The station appends, the voice client's player pops. When the buffer
+    is full the oldest frame is dropped, so a listener that falls behind
+    only loses its own audio.
+    """
+
+    def __init__(self, station, capacity=10):
+        self.station = station
+        self.frames = deque(maxlen=capacity)
+
+    def push(self, packet):
+        if len(self.frames) == self.frames.maxlen:
+            self.station.stats['dropped'] += 1
+        self.frames.append(packet)
+
+    def read(self):
+        try:
+            return self.frames.popleft()
+        except IndexError:
+            return SILENCE  # Never b'', which would end playback
+
+    def is_opus(self):
+        return True
+
+    def cleanup(self):
+        self.station.unsubscribe(self)
+
+
+class Station:
+    """A shared stream that many guilds listen to at once.
+
+    One broadcast thread reads ``sequence`` (a TrackSequence) in real time,
+    encodes PCM frames to Opus once, and hands the same packet to every
+    listener, so decoding and download cost is per station rather than per
+    guild. Once no one has listened for ``idle_timeout`` seconds the
+    thread stops and the decoders are released; ``position`` is kept so a
+    restart picks up where the station left off.
+    """
+
+    def __init__(self, name, url, buffer_frames=10, idle_timeout=60):
+        self.name = name
+        self.url = url  # Playlist the station loops through
+        self.key = f"radio:{name}"  # Stands in for a guild ID in scheduling and DSP settings
+        self.buffer_frames = buffer_frames
+        self.idle_timeout = idle_timeout
+
+        self.songs = []
+        self.position = 0  # Index in ``songs`` of the song playing
+        self.upcoming = None  # Index of the song preloaded next
+        self.sequence = None
+        self.running = False
+        self.listeners = frozenset()  # Replaced, never mutated, so the thread can iterate freely
+
+        # Reentrant: dropping the last reference to a listener runs its cleanup, which unsubscribes
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._encoder = None
+        self._thread = None
+        self.stats = {'frames': 0, 'silent_frames': 0, 'dropped': 0}
+
+    @property
+    def now_playing(self):
+        return self.songs[self.position] if self.running and self.songs else None
+
+    def subscribe(self):
+        listener = Listener(self, self.buffer_frames)
+        with self._lock:
+            self.listeners = self.listeners | {listener}
+        return listener
+
+    def unsubscribe(self, listener):
+        with self._lock:
+            self.listeners = self.listeners - {listener}
+
+    def start(self, sequence):
+        self.sequence = sequence
+        self.running = True
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._broadcast, name=f'radio-{self.name}', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """End the broadcast; the thread releases the decoders"""
+        self._stopped.set()
+        self.running = False
+
+    def _encode(self, pcm):
+        if self._encoder is None:
+            self._encoder = discord.opus.Encoder()
+        return self._encoder.encode(pcm, self._encoder.SAMPLES_PER_FRAME)
+
+    def _broadcast(self):
+        sequence = self.sequence
+        started = time.perf_counter()
+        loops = 0
+        last_heard = time.monotonic()
+        try:
+            while not self._stopped.is_set():
+                with self._lock:
+                    listeners = self.listeners
+                    if listeners:
+                        last_heard = time.monotonic()
+                    elif time.monotonic() - last_heard > self.idle_timeout:
+                        self.running = False
+                        return
+
+                frame = sequence.read()
+                if frame:
+                    packet = frame if sequence.is_opus() else self._encode(frame)
+                else:
+                    packet = SILENCE  # Between tracks, while the next one is looked up
+                    self.stats['silent_frames'] += 1
+                self.stats['frames'] += 1
+                for listener in listeners:
+                    listener.push(packet)
+
+                loops += 1
+                delay = started + loops * FRAME_DELAY - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -0.2:
+                    # Fell behind - carry on from now rather than bursting to catch up
+                    started, loops = time.perf_counter(), 0
+        except Exception as e:
+            logger.error(f"Station {self.name} stopped: {e}")
+            self.running = False
+        finally:
+            sequence.cleanup()
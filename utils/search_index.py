@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import math
+import re
+import sqlite3
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r'\w+')
+
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.6
+MAX_EXPANSIONS = 50  # Vocabulary tokens a single prefix or typo may expand to
+
+
+def tokenize(text):
+    """Lowercase, accent-free word tokens"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _WORD.findall(text)
+
+
+def _within_one_edit(a, b):
+    """True if ``b`` is ``a`` with one character inserted, deleted, replaced or two swapped"""
+    if a == b or abs(len(a) - len(b)) > 1:
+        return a == b
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:] or (a[i + 2:] == b[i + 2:] and a[i:i + 2] == b[i:i + 2][::-1])
+    return a[i:] == b[i + 1:]
+
+
+class SearchResult:
+    __slots__ = ('video_id', 'title', 'uploader', 'duration', 'score', 'exact', 'coverage')
+
+    def __init__(self, video_id, title, uploader, duration, score, exact, coverage):
+        self.video_id = video_id
+        self.title = title
+        self.uploader = uploader
+        self.duration = duration
+        self.score = score  # 0-1, how well the query matched
+        self.exact = exact  # Every query word matched a whole word or the start of one
+        self.coverage = coverage  # Share of the title's words the query matched
+
+
+class SearchIndex:
+    """Inverted index over the titles and uploaders of tracks resolved before.
+
+    Lookups run in memory: whole words match through posting sets, partial
+    words through a sorted vocabulary and typos through a one-edit check
+    against words sharing the first letter. New tracks are added
+    incrementally and written to SQLite in batches by ``save``.
+    """
+
+    def __init__(self, path='search.db', confidence=0.75, margin=0.1):
+        self.confidence = confidence  # Score a match needs to answer a query by itself
+        self.margin = margin  # Lead it needs over the runner-up
+
+        self._docs = {}  # Video ID -> [title, uploader, duration, hits, title token count]
+        self._postings = defaultdict(set)  # Token -> video IDs
+        self._uploader_only = {}  # Token -> video IDs with it in the uploader but not the title
+        self._vocabulary = []  # Sorted tokens, for prefix and typo lookups
+        self._pending = {}  # Video ID -> row not yet written to disk
+
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS tracks ('
+            ' id TEXT PRIMARY KEY, title TEXT NOT NULL, uploader TEXT,'
+            ' duration INTEGER NOT NULL, hits INTEGER NOT NULL)'
+        )
+        self._db.commit()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='search-index')
+        self.stats = {'lookups': 0, 'confident': 0, 'search_time': 0.0}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _index(self, video_id, title, uploader, duration, hits):
+        title_tokens = tokenize(title)
+        uploader_tokens = set(tokenize(uploader or '')) - set(title_tokens)
+        self._docs[video_id] = [title, uploader, duration, hits, max(len(title_tokens), 1)]
+        for token in set(title_tokens) | uploader_tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                insort(self._vocabulary, token)
+            postings.add(video_id)
+        for token in uploader_tokens:
+            self._uploader_only.setdefault(token, set()).add(video_id)
+
+    def add(self, song):
+        """Index a resolved song; known songs only get their metadata refreshed"""
+        video_id = song.video_id
+        if not video_id or not song.title:
+            return
+        doc = self._docs.get(video_id)
+        if doc is not None:
+            if doc[0] == song.title:
+                return
+            self._remove(video_id)
+        hits = doc[3] if doc else 0
+        self._index(video_id, song.title, song.uploader, song.duration, hits)
+        self._pending[video_id] = (video_id, song.title, song.uploader, song.duration, hits)
+
+    def _remove(self, video_id):
+        title, uploader = self._docs.pop(video_id)[:2]
+        for token in set(tokenize(title) + tokenize(uploader or '')):
+            postings = self._postings.get(token)
+            if postings:
+                postings.discard(video_id)
+            uploader_only = self._uploader_only.get(token)
+            if uploader_only:
+                uploader_only.discard(video_id)
+
+    def record_hit(self, video_id):
+        """Count a track picked from search results, to rank it higher next time"""
+        doc = self._docs.get(video_id)
+        if doc:
+            doc[3] += 1
+            self._pending[video_id] = (video_id, doc[0], doc[1], doc[2], doc[3])
+
+    def _expand(self, token, last):
+        """Vocabulary tokens a query word may stand for, with match weights"""
+        expansions = []
+        if token in self._postings:
+            expansions.append((token, 1.0))
+        vocabulary = self._vocabulary
+        # Whole words are typed out except, usually, the last one
+        if len(token) >= (2 if last else 3):
+            start = bisect_left(vocabulary, token)
+            for candidate in vocabulary[start:start + MAX_EXPANSIONS + 1]:
+                if not candidate.startswith(token):
+                    break
+                if candidate != token:
+                    expansions.append((candidate, PREFIX_WEIGHT))
+        if not expansions and len(token) >= 4:
+            start = bisect_left(vocabulary, token[0])
+            end = bisect_left(vocabulary, chr(ord(token[0]) + 1))
+            for candidate in vocabulary[start:end]:
+                if _within_one_edit(token, candidate):
+                    expansions.append((candidate, FUZZY_WEIGHT))
+                    if len(expansions) >= MAX_EXPANSIONS:
+                        break
+        return expansions
+
+    def search(self, query, limit=10):
+        """Return the best matching tracks for a query, best first"""
+        started = time.perf_counter()
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words or not self._docs:
+            return []
+
+        total_docs = len(self._docs)
+        scores = defaultdict(float)
+        matched = defaultdict(int)
+        exact = defaultdict(int)
+        total_weight = 0.0
+        for position, word in enumerate(words):
+            best = {}
+            in_title = set()  # Tracks this word matched in the title, not just the uploader
+            for token, weight in self._expand(word, position == len(words) - 1):
+                uploader_only = self._uploader_only.get(token, ())
+                for video_id in self._postings[token]:
+                    if weight > best.get(video_id, 0.0):
+                        best[video_id] = weight
+                    if video_id not in uploader_only:
+                        in_title.add(video_id)
+            # Rare words say more about which track is meant
+            idf = math.log(1 + total_docs / (len(best) or 1))
+            total_weight += idf
+            for video_id, weight in best.items():
+                scores[video_id] += weight * idf
+                if video_id in in_title:
+                    matched[video_id] += 1
+                if weight >= PREFIX_WEIGHT:
+                    exact[video_id] += 1
+
+        results = []
+        for video_id, score in scores.items():
+            title, uploader, duration, hits, length = self._docs[video_id]
+            # Prefer titles that don't hold much besides what was asked for
+            coverage = min(matched[video_id] / length, 1.0)
+            score = score / total_weight * (0.85 + 0.15 * coverage)
+            results.append((score, hits, video_id, coverage))
+        results.sort(reverse=True)
+
+        self.stats['lookups'] += 1
+        self.stats['search_time'] += time.perf_counter() - started
+        return [
+            SearchResult(video_id, *self._docs[video_id][:3], score, exact[video_id] == len(words), coverage)
+            for score, hits, video_id, coverage in results[:limit]
+        ]
+
+    def best_match(self, query):
+        """Return the result a query certainly means, or None if unsure"""
+        results = self.search(query, limit=2)
+        if not results:
+            return None
+        top = results[0]
+        if not top.exact or top.score < self.confidence:
+            return None
+        if not top.coverage:
+            return None  # Only the uploader matched - an artist's name doesn't say which song
+        if top.coverage < 0.5 and len(tokenize(query)) < 2:
+            return None  # A single word that is a small part of the title is too vague
+        if len(results) > 1 and top.score - results[1].score < self.margin:
+            return None
+        self.stats['confident'] += 1
+        return top
+
+    async def load(self):
+        """Rebuild the in-memory index from disk without blocking the event loop for long"""
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(
+            self._executor,
+            lambda: self._db.execute('SELECT id, title, uploader, duration, hits FROM tracks').fetchall()
+        )
+        for count, (video_id, title, uploader, duration, hits) in enumerate(rows, 1):
+            if video_id not in self._docs:
+                self._index(video_id, title, uploader, duration, hits)
+            if count % 2000 == 0:
+                await asyncio.sleep(0)
+        logger.info(f"🔎 Search index loaded with {len(self._docs)} tracks")
+
+    async def save(self):
+        """Write tracks added since the last save"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._write, list(pending.values()))
+        except Exception:
+            # Keep the rows for the next save, unless they changed meanwhile
+            self._pending = {**pending, **self._pending}
+            raise
+
+    def _write(self, rows):
+        try:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO tracks (id, title, uploader, duration, hits) VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+
+    def close(self):
+        """Finish pending writes and close the database"""
+        self._executor.shutdown(wait=True)
+        if self._pending:
+            self._write(list(self._pending.values()))
+        self._db.close()
@@ -0,0 +1,44 @@
+import discord
+
+from utils.music_utils import format_time
+
+
+class SearchPicker(discord.ui.View):
+    """Dropdown of search results; ``on_pick(result)`` runs when the requester chooses one"""
+
+    def __init__(self, author, results, on_pick, timeout=60):
+        super().__init__(timeout=timeout)
+        self.author = author
+        self.results = {result.video_id: result for result in results}
+        self.on_pick = on_pick
+        self.message = None
+
+        options = [
+            discord.SelectOption(
+                label=result.title[:100],
+                description=f"{result.uploader or 'Unknown'} · {format_time(result.duration)}"[:100],
+                value=result.video_id
+            )
+            for result in results
+        ]
+        self.select = discord.ui.Select(placeholder="Pick a song to play", options=options)
+        self.select.callback = self._picked
+        self.add_item(self.select)
+
+    async def interaction_check(self, interaction):
+        return interaction.user.id == self.author.id
+
+    async def _picked(self, interaction):
+        result = self.results[self.select.values[0]]
+        self.stop()
+        self.select.disabled = True
+        await interaction.response.edit_message(view=self)
+        await self.on_pick(result)
+
+    async def on_timeout(self):
+        self.select.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
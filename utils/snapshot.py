@@ -0,0 +1,130 @@
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_UNWRITTEN = object()  # Version of a guild whose last write failed; never equals a real one
+
+
+class SnapshotStore:
+    """Persists each guild's playback state to SQLite so it survives restarts.
+
+    Snapshots are incremental: the small playback row (channel, current song,
+    position) is rewritten every time, but a guild's upcoming songs are only
+    serialized again when its queue version changed. All writes run on a
+    dedicated thread so they never block the event loop.
+    """
+
+    def __init__(self, path='snapshot.db'):
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS playback ('
+            ' guild_id INTEGER PRIMARY KEY, channel_id INTEGER NOT NULL,'
+            ' current TEXT, position REAL NOT NULL, updated REAL NOT NULL)'
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS queues ('
+            ' guild_id INTEGER PRIMARY KEY, version INTEGER NOT NULL, songs TEXT NOT NULL)'
+        )
+        self._db.commit()
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='snapshot')
+        self._versions = {}  # Guild ID -> queue version last written
+        self._pending_deletes = set()  # Removed guilds whose DELETE hasn't committed yet
+        self.stats = {'snapshots': 0, 'queue_writes': 0, 'write_time': 0.0}
+
+    def capture(self, guild_id, channel_id, queue, position):
+        """Copy one guild's state on the event loop, ready to be written"""
+        current = queue.current.to_record() if queue.current else None
+        songs = None
+        if self._versions.get(guild_id) != queue.version:
+            songs = [song.to_record() for song in queue]
+            self._versions[guild_id] = queue.version
+        return (guild_id, channel_id, current, position, queue.version, songs)
+
+    def tracked(self):
+        """Guild IDs that currently have a saved snapshot"""
+        return list(self._versions)
+
+    def forget(self, guild_id):
+        """Stop tracking a guild; returns True if it had a saved snapshot"""
+        return self._versions.pop(guild_id, None) is not None
+
+    async def save(self, states, removed=()):
+        """Write captured states and delete removed guilds off the event loop.
+
+        Deletes that fail are retried by every later save until they commit.
+        """
+        # A guild written again is active again - deleting it would lose the new state
+        deletes = (self._pending_deletes | set(removed)) - {state[0] for state in states}
+        if not states and not deletes:
+            return
+        self._pending_deletes = deletes
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._write, states, list(deletes))
+        except Exception:
+            # Nothing was committed - make the next capture write these queues again
+            for state in states:
+                if state[0] in self._versions:
+                    self._versions[state[0]] = _UNWRITTEN
+            raise
+        self._pending_deletes -= deletes
+
+    def _write(self, states, removed):
+        try:
+            self._write_rows(states, removed)
+        except Exception:
+            self._db.rollback()
+            raise
+
+    def _write_rows(self, states, removed):
+        started = time.perf_counter()
+        now = time.time()
+        for guild_id, channel_id, current, position, version, songs in states:
+            self._db.execute(
+                'INSERT OR REPLACE INTO playback (guild_id, channel_id, current, position, updated)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (guild_id, channel_id, json.dumps(current), position, now)
+            )
+            if songs is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO queues (guild_id, version, songs) VALUES (?, ?, ?)',
+                    (guild_id, version, json.dumps(songs, separators=(',', ':')))
+                )
+                self.stats['queue_writes'] += 1
+        for guild_id in removed:
+            self._db.execute('DELETE FROM playback WHERE guild_id = ?', (guild_id,))
+            self._db.execute('DELETE FROM queues WHERE guild_id = ?', (guild_id,))
+        self._db.commit()
+        self.stats['snapshots'] += 1
+        self.stats['write_time'] += time.perf_counter() - started
+
+    async def load(self):
+        """Return every saved guild state"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._read)
+
+    def _read(self):
+        rows = self._db.execute(
+            'SELECT p.guild_id, p.channel_id, p.current, p.position, q.songs'
+            ' FROM playback p LEFT JOIN queues q ON q.guild_id = p.guild_id'
+        ).fetchall()
+        return [
+            {
+                'guild_id': guild_id,
+                'channel_id': channel_id,
+                'current': json.loads(current) if current else None,
+                'position': position,
+                'songs': json.loads(songs) if songs else [],
+            }
+            for guild_id, channel_id, current, position, songs in rows
+        ]
+
+    def close(self):
+        """Finish pending writes and close the database"""
+        self._executor.shutdown(wait=True)
+        self._db.close()
@@ -0,0 +1,36 @@
+import time
+
+
+class StartupTimer:
+    """Records how long each phase of start-up took.
+
+    Phases are marked in order, each lasting from the previous mark (or
+    the timer's creation) to its own. Work that runs alongside the
+    phases, like warming up the extractor, is recorded separately.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases = {}  # Phase name -> seconds, in the order they finished
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = now - self._last
+        self._last = now
+
+    def record(self, phase, seconds):
+        self.phases[phase] = seconds
+
+    @property
+    def total(self):
+        """Seconds from the timer's creation to the last mark"""
+        return self._last - self.started
+
+    def report(self):
+        parts = ', '.join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.phases.items())
+        return f"Started in {self.total * 1000:.0f}ms ({parts})"
+
+
+# Process-wide; bot.py imports this module first, so it times everything after
+timer = StartupTimer()